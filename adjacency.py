@@ -0,0 +1,168 @@
+'''
+Precomputed neighbour index used by the searches.
+
+Cells get flat integer ids in the grid padded with a one cell border of walls,
+so a cell's neighbours are always at id + offset for a fixed tuple of offsets
+(4 without diagonals, 8 with) and never need clamping or bounds checks. This is
+the CSR layout of a regular grid graph: every row of the adjacency matrix has
+the same column offsets, so only the offsets are stored.
+
+The cost of moving to a neighbour is step * (costs[neighbour] + exits[node]),
+where step is 1 or sqrt(2), costs holds the cost of entering each cell (inf for
+walls and for the padding) and exits the extra cost of leaving it (0 unless the
+grid has exit costs). Both are flat lists the searches index directly, with
+one shared float object for each different cost rather than one per cell.
+
+heuristic_scale is the least any move can cost per unit of distance, so
+multiplying a distance estimate by it keeps A*'s heuristic admissible whatever
+the costs are. integral says whether every cost is a whole number, in which
+case straight moves only ever add whole numbers to a distance and dijkstra can
+use a bucket queue, as long as max_move_cost (the most a straight move can
+cost) is small enough for stepping through the buckets to stay cheap.
+'''
+import numpy as np
+from math import inf
+
+# Same order as get_neighbours in pathfinding.py
+STRAIGHT = ((1,0), (-1,0), (0,1), (0,-1))
+DIAGONAL = ((1,1), (1,-1), (-1,1), (-1,-1))
+
+# Most different costs a grid can have for its cost lists to share one float object per cost
+SHARED_FLOATS_LIMIT = 256
+
+
+class Adjacency():
+    def __init__(self, rows, columns, diagonals=False):
+        self.rows = rows
+        self.columns = columns
+        self.diagonals = diagonals
+        self.width = columns + 2
+        self.size = (rows + 2) * self.width
+
+        directions = STRAIGHT + DIAGONAL if diagonals else STRAIGHT
+        self.offsets = tuple(dr * self.width + dc for dr, dc in directions)
+        self.steps = tuple(1 if dr == 0 or dc == 0 else 2**0.5 for dr, dc in directions)
+        # (offset, step) pairs, which is what the search loops iterate over
+        self.moves = tuple(zip(self.offsets, self.steps))
+
+        self.costs = None
+        self.exits = None
+        # Cheapest cost of entering and of leaving any walkable cell
+        self.min_cost = 1
+        self.min_exit = 0
+        # Dearest cost of entering and of leaving any walkable cell
+        self.max_cost = 1
+        self.max_exit = 0
+        # Whether every walkable cell's costs are whole numbers
+        self.integral = True
+        self.version = None
+        self.states = {}
+
+    # Flat id of a (row, column) cell
+    def index(self, row, column):
+        return (row + 1) * self.width + column + 1
+
+    # (row, column) of a flat id
+    def cell(self, node):
+        row, column = divmod(node, self.width)
+        return (row - 1, column - 1)
+
+    # Reload the per-cell costs from (unpadded) entry cost and, optionally, exit cost arrays
+    def update_costs(self, costs, exit_costs=None):
+        padded = np.full((self.rows + 2, self.width), inf)
+        padded[1:-1, 1:-1] = costs
+        self.costs = shared_floats(padded.ravel())
+
+        if exit_costs is None:
+            # Every entry is the same 0.0 object, so this is only the list's own pointers
+            self.exits = [0.0] * self.size
+        else:
+            padded = np.zeros((self.rows + 2, self.width))
+            padded[1:-1, 1:-1] = exit_costs
+            self.exits = shared_floats(padded.ravel())
+
+        walkable = np.isfinite(costs)
+        if walkable.any():
+            self.min_cost = float(costs[walkable].min())
+            self.min_exit = float(exit_costs[walkable].min()) if exit_costs is not None else 0
+            self.max_cost = float(costs[walkable].max())
+            self.max_exit = float(exit_costs[walkable].max()) if exit_costs is not None else 0
+        else:
+            self.min_cost, self.min_exit = 1, 0
+            self.max_cost, self.max_exit = 1, 0
+        self.integral = bool((costs[walkable] % 1 == 0).all() and (exit_costs is None or (exit_costs[walkable] % 1 == 0).all()))
+
+    # Reload the costs of a single cell
+    def update_cell(self, row, column, cost, exit_cost=0):
+        node = self.index(row, column)
+        self.costs[node] = float(cost)
+        self.exits[node] = float(exit_cost)
+        if cost != inf:
+            self.min_cost = min(self.min_cost, float(cost))
+            self.min_exit = min(self.min_exit, float(exit_cost))
+            self.max_cost = max(self.max_cost, float(cost))
+            self.max_exit = max(self.max_exit, float(exit_cost))
+            # Like the minimums, only ever goes one way until the next full reload
+            if cost % 1 or exit_cost % 1:
+                self.integral = False
+
+    # The least a move can cost per unit of distance, to scale heuristics by
+    @property
+    def heuristic_scale(self):
+        return self.min_cost + self.min_exit
+
+    # The most a straight move can cost
+    @property
+    def max_move_cost(self):
+        return self.max_cost + self.max_exit
+
+    # Neighbours of a flat id as (neighbour, cost) pairs, skipping walls
+    def neighbours(self, node):
+        costs = self.costs
+        leave = self.exits[node]
+        for offset, step in self.moves:
+            neighbour = node + offset
+            if costs[neighbour] != inf:
+                yield neighbour, step * (costs[neighbour] + leave)
+
+    # Per-node search arrays for this adjacency, cleared and ready for a new run
+    # Searches that need more than one set (e.g. bidirectional) ask for them by name
+    def search_state(self, name='forward'):
+        state = self.states.get(name)
+        if state is None:
+            state = self.states[name] = SearchState(self.size)
+        else:
+            state.reset()
+        return state
+
+
+# values as a list of Python floats. When there are only a few different values (as with the
+# node types) the entries share one float object per value, instead of tolist() making a new
+# 24 byte object for every cell
+def shared_floats(values):
+    distinct = np.unique(values)
+    if len(distinct) > SHARED_FLOATS_LIMIT:
+        return values.tolist()
+    table = np.empty(len(distinct), dtype=object)
+    table[:] = distinct.tolist()
+    return table[np.searchsorted(distinct, values)].tolist()
+
+
+# Flat per-node arrays used by the searches. They are allocated once per
+# adjacency and reused between runs: only the entries a run actually touched
+# are reset, so starting a search costs nothing proportional to the grid.
+class SearchState():
+    def __init__(self, size):
+        # Best known distance from the start to each node
+        self.g = [inf] * size
+        # The node each node was reached from on that best route. Only read by
+        # following a chain back from a node reached in the current run, so it
+        # never needs resetting
+        self.parent = [None] * size
+        self.touched = []
+
+    def reset(self):
+        g = self.g
+        for node in self.touched:
+            g[node] = inf
+        self.touched = []
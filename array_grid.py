@@ -0,0 +1,399 @@
+'''
+Compact, NumPy array-backed grid.
+
+Instead of one Node object per cell, the grid keeps four arrays:
+
+    types           uint8    index into Node.nodetypes
+    costs           float32  distance modifier of each cell (inf for walls)
+    visited_stamps  uint16   epoch in which each cell was last visited
+    path_stamps     uint16   epoch in which each cell was last put on a path
+
+so a 2000x2000 grid takes ~36MB and can be reset, copied and compared with
+vectorised operations. A cell is visited (or on the path) only if its stamp
+equals the grid's current epoch, so clear_visited() just starts a new epoch
+instead of touching every cell; flags puts the two together as a bitmask of
+VISITED and PATH when the whole grid is wanted (e.g. for drawing it). grid[row][column] still returns an object that behaves
+like a Node (nodetype, is_visited, is_path, color, update(...)) so existing
+code keeps working.
+
+version is bumped whenever types or costs change, which lets cached data (such
+as the search adjacency and the connected components) know when it needs
+refreshing. Single cell changes are also kept in a short log, so that data can
+be patched instead of rebuilt.
+Cells changed through grid[row][column].update(...), and the cells a
+clear_visited() unmarks, are collected in a dirty set too, so a display only
+has to redraw those.
+
+costs start out as each node type's distance modifier, but set_costs() can give
+cells any cost (an elevation or heat map, say) without changing their type, and
+set_exit_costs() adds an optional fourth array: the extra cost of leaving each
+cell, for costs that depend on the direction of travel.
+'''
+import numpy as np
+from node import Node
+from adjacency import Adjacency
+from components import Components
+from jump_table import JumpTable
+
+NODETYPES = Node.nodetypes
+TYPE_CODES = {nodetype: code for code, nodetype in enumerate(NODETYPES)}
+TYPE_COSTS = np.array([Node.distance_modifiers[nodetype] for nodetype in NODETYPES], dtype=np.float32)
+
+VISITED = 1
+PATH = 2
+
+# Stamps are uint16, so every this many clears the stamp arrays are zeroed and the epochs start again
+MAX_EPOCH = 2**16 - 1
+DORMANT = TYPE_CODES['dormant']
+
+# Colour of each node type in each state, indexed as COLORS[state, type] where
+# state is 0 for regular, 1 for visited and 2 for path
+COLORS = np.array([[Node.colors[state][nodetype] for nodetype in NODETYPES] for state in ('regular', 'visited', 'path')], dtype=np.uint8)
+
+# How many single cell changes to remember before treating them as a bulk change
+CHANGE_LOG_LIMIT = 1024
+
+
+class ArrayGrid():
+    def __init__(self, rows, nodetype='blank', columns=None):
+        columns = rows if columns is None else columns
+        self.types = np.full((rows, columns), TYPE_CODES[nodetype], dtype=np.uint8)
+        self.costs = np.full((rows, columns), TYPE_COSTS[TYPE_CODES[nodetype]], dtype=np.float32)
+        self.visited_stamps = np.zeros((rows, columns), dtype=np.uint16)
+        self.path_stamps = np.zeros((rows, columns), dtype=np.uint16)
+        self.epoch = 1
+        # Whether there may be dormant cells for clear_visited to wake up
+        self.has_dormant = nodetype == 'dormant'
+        self.exit_costs = None
+        self.uniform_version = None
+        self.version = 0
+        self.change_log = []
+        self.change_log_start = 0
+        self.adjacencies = {}
+        self.component_indexes = {}
+        self.jump_tables = {}
+        # Cells changed through grid[row][column].update(...) since take_dirty() was last
+        # called, or None if a bulk change means the whole grid should be treated as changed
+        self.dirty = None
+
+    @property
+    def shape(self):
+        return self.types.shape
+
+    @property
+    def nbytes(self):
+        return self.types.nbytes + self.costs.nbytes + self.visited_stamps.nbytes + self.path_stamps.nbytes
+
+    # Bitmask of VISITED and PATH for every cell, built from the stamps each time it is asked for
+    @property
+    def flags(self):
+        epoch = self.epoch
+        return ((self.visited_stamps == epoch) * VISITED | (self.path_stamps == epoch) * PATH).astype(np.uint8)
+
+    # Bitmask of VISITED and PATH for a single cell
+    def flags_at(self, row, column):
+        epoch = self.epoch
+        return (self.visited_stamps[row, column] == epoch) * VISITED | (self.path_stamps[row, column] == epoch) * PATH
+
+    def __len__(self):
+        return self.types.shape[0]
+
+    def __getitem__(self, row):
+        return GridRow(self, row)
+
+    def nodetype(self, row, column):
+        return NODETYPES[self.types[row, column]]
+
+    # Set the node type of a whole region at once, e.g. grid.fill('wall', (5, slice(None)))
+    def fill(self, nodetype, where=(slice(None), slice(None))):
+        code = TYPE_CODES[nodetype]
+        self.types[where] = code
+        self.costs[where] = TYPE_COSTS[code]
+        if code == DORMANT:
+            self.has_dormant = True
+        self.bulk_changed()
+
+    # Set the type codes of a region from an array of them, e.g. a band of rows: grid.set_types(band, slice(10, 20))
+    def set_types(self, types, where=(slice(None), slice(None))):
+        self.types[where] = types
+        self.costs[where] = TYPE_COSTS[types]
+        if (np.asarray(types) == DORMANT).any():
+            self.has_dormant = True
+        self.bulk_changed()
+
+    # Give a region any (non-negative) costs, leaving walls as walls, e.g. grid.set_costs(1 + heights / 10)
+    def set_costs(self, costs, where=(slice(None), slice(None))):
+        assert (np.asarray(costs) >= 0).all(), "costs must not be negative"
+        blocked = np.isinf(TYPE_COSTS[self.types[where]])
+        self.costs[where] = np.where(blocked, np.inf, costs)
+        self.bulk_changed()
+
+    # Set the extra cost of leaving each cell (or None for no exit costs), so moving
+    # from one cell to the next costs step * (cost of the next cell + exit cost of this one)
+    def set_exit_costs(self, exit_costs):
+        if exit_costs is not None:
+            exit_costs = np.broadcast_to(np.asarray(exit_costs, dtype=np.float32), self.shape).copy()
+            assert (exit_costs >= 0).all(), "exit costs must not be negative"
+        self.exit_costs = exit_costs
+        self.bulk_changed()
+
+    # Clear visited/path flags and wake up dormant nodes, keeping walls, mud, start and end
+    # Unless there are dormant nodes this doesn't touch the cells at all. If a display is collecting
+    # dirty cells, the ones that were visited or on the path are added to them, so only those are redrawn
+    # (unless that is most of the grid)
+    def clear_visited(self):
+        if self.has_dormant:
+            dormant = self.types == DORMANT
+            if dormant.any():
+                self.fill('blank', dormant)
+            self.has_dormant = False
+        if self.dirty is not None:
+            stamped = (self.visited_stamps == self.epoch) | (self.path_stamps == self.epoch)
+            # Past a point redrawing everything is quicker than redrawing cell by cell
+            if np.count_nonzero(stamped) > stamped.size // 4:
+                self.dirty = None
+            else:
+                self.dirty.update(map(tuple, np.argwhere(stamped).tolist()))
+        self.new_epoch()
+
+    # Start a new epoch, in which no cell is visited or on a path yet
+    def new_epoch(self):
+        self.epoch += 1
+        if self.epoch > MAX_EPOCH:
+            self.visited_stamps[:] = 0
+            self.path_stamps[:] = 0
+            self.epoch = 1
+
+    # Set every cell to the given node type, keeping the cells in excluded as they are
+    def reset(self, nodetype='blank', excluded=()):
+        kept = [(cell, self.types[cell], self.flags_at(*cell)) for cell in excluded]
+        self.fill(nodetype)
+        self.new_epoch()
+        for cell, code, flags in kept:
+            self.types[cell] = code
+            self.costs[cell] = TYPE_COSTS[code]
+            if flags & VISITED:
+                self.visited_stamps[cell] = self.epoch
+            if flags & PATH:
+                self.path_stamps[cell] = self.epoch
+        self.bulk_changed()
+
+    # A grid around existing types, costs and (optionally) exit costs arrays (e.g. ones in shared memory), with its own flags
+    @classmethod
+    def from_arrays(cls, types, costs, exit_costs=None):
+        grid = cls.__new__(cls)
+        grid.types = types
+        grid.costs = costs
+        grid.visited_stamps = np.zeros(types.shape, dtype=np.uint16)
+        grid.path_stamps = np.zeros(types.shape, dtype=np.uint16)
+        grid.epoch = 1
+        grid.has_dormant = True
+        grid.exit_costs = exit_costs
+        grid.uniform_version = None
+        grid.version = 0
+        grid.change_log = []
+        grid.change_log_start = 0
+        grid.adjacencies = {}
+        grid.component_indexes = {}
+        grid.jump_tables = {}
+        grid.dirty = None
+        return grid
+
+    def copy(self):
+        other = ArrayGrid.from_arrays(self.types.copy(), self.costs.copy())
+        other.visited_stamps = self.visited_stamps.copy()
+        other.path_stamps = self.path_stamps.copy()
+        other.epoch = self.epoch
+        other.has_dormant = self.has_dormant
+        if self.exit_costs is not None:
+            other.exit_costs = self.exit_costs.copy()
+        return other
+
+    # Record that the type or cost of a single cell has changed
+    def cell_changed(self, row, column):
+        self.version += 1
+        self.change_log.append((row, column))
+        if len(self.change_log) > CHANGE_LOG_LIMIT:
+            self.bulk_changed()
+
+    # Record that types or costs have changed in a way that isn't worth logging cell by cell
+    def bulk_changed(self):
+        self.version += 1
+        self.change_log = []
+        self.change_log_start = self.version
+        self.dirty = None
+
+    # The cells changed through NodeView.update since the last call (None meaning all of them), for redrawing
+    def take_dirty(self):
+        dirty = self.dirty
+        self.dirty = set()
+        return dirty
+
+    # The cells changed since the given version, or None if that isn't known
+    # (e.g. after a bulk change) and everything should be assumed to have changed
+    def changes_since(self, version):
+        if version is None or version < self.change_log_start:
+            return None
+        return self.change_log[version - self.change_log_start:]
+
+    # Neighbour index for searching this grid, built once per diagonal setting
+    # and refreshed when the grid has changed since it was last used
+    def adjacency(self, diagonals=False):
+        adjacency = self.adjacencies.get(diagonals)
+        if adjacency is None:
+            adjacency = self.adjacencies[diagonals] = Adjacency(*self.shape, diagonals=diagonals)
+        if adjacency.version != self.version:
+            changes = self.changes_since(adjacency.version)
+            if changes is None:
+                adjacency.update_costs(self.costs, self.exit_costs)
+            else:
+                exit_costs = self.exit_costs
+                for row, column in changes:
+                    exit_cost = exit_costs[row, column] if exit_costs is not None else 0
+                    adjacency.update_cell(row, column, self.costs[row, column], exit_cost)
+            adjacency.version = self.version
+        return adjacency
+
+    # Connected components of the open cells (see components.py), kept up to date the same way
+    def components(self, diagonals=False):
+        adjacency = self.adjacency(diagonals)
+        components = self.component_indexes.get(diagonals)
+        if components is None:
+            components = self.component_indexes[diagonals] = Components(adjacency)
+        if components.version != self.version:
+            changes = self.changes_since(components.version)
+            if changes is None:
+                components.rebuild(np.isfinite(self.costs))
+            else:
+                for row, column in changes:
+                    components.update_cell(row, column)
+            components.version = self.version
+        return components
+
+    # Jump distances for jump point search (see jump_table.py), patched for the cells changed since
+    # they were last used, or checked against the whole grid after a bulk change
+    def jump_table(self, diagonals=False):
+        table = self.jump_tables.get(diagonals)
+        if table is None:
+            table = self.jump_tables[diagonals] = JumpTable(self.adjacency(diagonals))
+        if table.version != self.version:
+            table.update(self.costs, self.changes_since(table.version))
+            table.version = self.version
+        return table
+
+    # (rows, columns, 3) array of every cell's colour, the same as grid[row][column].color
+    def colors(self):
+        state = np.where(self.flags & PATH, 2, self.flags & VISITED)
+        return COLORS[state, self.types]
+
+    # True if every cell that can be walked on costs the same to enter and to leave (no mud)
+    # Worked out again only after the grid has changed
+    def has_uniform_costs(self):
+        if self.uniform_version != self.version:
+            self.uniform = True
+            walkable = np.isfinite(self.costs)
+            for costs in (self.costs, self.exit_costs):
+                if costs is None:
+                    continue
+                costs = costs[walkable]
+                if costs.size and not (costs == costs[0]).all():
+                    self.uniform = False
+            self.uniform_version = self.version
+        return self.uniform
+
+    def equals(self, other):
+        return (np.array_equal(self.types, other.types)
+                and np.array_equal(self.costs, other.costs)
+                and np.array_equal(self.flags, other.flags))
+
+    # Cells (row, column) whose type, cost or flags differ from other
+    def changed_cells(self, other):
+        changed = (self.types != other.types) | (self.costs != other.costs) | (self.flags != other.flags)
+        return [tuple(cell) for cell in np.argwhere(changed).tolist()]
+
+
+# A single row of an ArrayGrid, so that grid[row][column] works
+class GridRow():
+    __slots__ = ('grid', 'row')
+
+    def __init__(self, grid, row):
+        self.grid = grid
+        self.row = row
+
+    def __len__(self):
+        return self.grid.types.shape[1]
+
+    def __getitem__(self, column):
+        return NodeView(self.grid, self.row, column)
+
+
+# Node-like view onto one cell of an ArrayGrid
+class NodeView():
+    __slots__ = ('grid', 'row', 'column')
+
+    def __init__(self, grid, row, column):
+        self.grid = grid
+        self.row = row
+        self.column = column
+
+    @property
+    def nodetype(self):
+        return NODETYPES[self.grid.types[self.row, self.column]]
+
+    @property
+    def is_visited(self):
+        return bool(self.grid.visited_stamps[self.row, self.column] == self.grid.epoch)
+
+    @property
+    def is_path(self):
+        return bool(self.grid.path_stamps[self.row, self.column] == self.grid.epoch)
+
+    @property
+    def distance_modifier(self):
+        return float(self.grid.costs[self.row, self.column])
+
+    @property
+    def rcolor(self):
+        return Node.colors['regular'][self.nodetype]
+
+    @property
+    def vcolor(self):
+        return Node.colors['visited'][self.nodetype]
+
+    @property
+    def pcolor(self):
+        return Node.colors['path'][self.nodetype]
+
+    @property
+    def color(self):
+        flags = self.grid.flags_at(self.row, self.column)
+        state = 'path' if flags & PATH else 'visited' if flags & VISITED else 'regular'
+        return Node.colors[state][self.nodetype]
+
+    # Same behaviour as Node.update
+    def update(self, nodetype=False, is_visited='unchanged', is_path='unchanged', nodetypes=NODETYPES):
+        grid, cell = self.grid, (self.row, self.column)
+        old = (grid.types[cell], grid.flags_at(*cell))
+
+        if nodetype:
+            assert nodetype in nodetypes, f"nodetype must be one of: {nodetypes}"
+            if (self.nodetype == ('start' or 'end')) and (nodetype == ('wall' or 'mud')):
+                pass
+            elif grid.types[cell] != TYPE_CODES[nodetype]:
+                code = TYPE_CODES[nodetype]
+                grid.types[cell] = code
+                grid.costs[cell] = TYPE_COSTS[code]
+                if code == DORMANT:
+                    grid.has_dormant = True
+                grid.cell_changed(*cell)
+
+        if is_visited != 'unchanged':
+            assert type(is_visited) == bool, "'is_visited' must be boolean: True or False"
+            grid.visited_stamps[cell] = grid.epoch if is_visited else 0
+
+        if is_path != 'unchanged':
+            assert type(is_path) == bool, "'is_path' must be boolean: True or False"
+            grid.path_stamps[cell] = grid.epoch if is_path else 0
+
+        if grid.dirty is not None and (grid.types[cell], grid.flags_at(*cell)) != old:
+            grid.dirty.add(cell)
@@ -0,0 +1,333 @@
+'''
+Headless benchmarks for the searches and maze generators.
+
+Runs dijkstra, A*, BFS and DFS on seeded maps from each generator at several
+grid sizes, and records for each run the wall time (best of a few repeats, and
+how far apart the repeats were), what the search's stats say it did (nodes
+expanded and pushed, stale pops, largest frontier, path and time per phase)
+and, up to MEMORY_MAX_SIZE, the peak memory allocated during the search. The
+generators themselves are timed too.
+
+Results are written to a JSON file and compared against a baseline, by default
+the one kept in the repo (benchmark_baseline.json). Every measurement that got
+worse by more than the tolerance is reported and the script exits with status
+1; times that look worse are measured again first, since noise rarely repeats.
+The counts (nodes expanded, pushes, path costs) are the same on any machine and
+are always compared, but times and memory only against a baseline made on the
+same machine:
+
+    python benchmark.py --output before.json --no-baseline
+    python benchmark.py --baseline before.json
+    python benchmark.py --sizes 95 --maps open prim --algorithms astar
+'''
+import gc
+import os
+import heapq
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tracemalloc
+import numpy as np
+from datetime import datetime
+from array_grid import TYPE_CODES
+from pathfinding import make_grid, prim, better_prim, recursive_division, eller, random_terrain, noise_terrain, dijkstra, xfs
+
+MAPS = ('open', 'prim', 'better_prim', 'recursive_division', 'random_terrain', 'eller', 'noise_terrain')
+DEFAULT_MAPS = ('open', 'prim', 'better_prim', 'recursive_division', 'random_terrain')
+ALGORITHMS = ('dijkstra', 'astar', 'bfs', 'dfs')
+SIZES = (95, 500, 2000)
+
+# Measurements compared between the results and the baseline, where bigger is worse
+# (max_frontier is recorded but not compared: a search that stops sooner can leave more behind on its frontier)
+METRICS = ('time', 'expanded', 'pushes', 'stale_pops', 'peak_memory')
+# Searches that always find the cheapest path, so their path cost should never change
+EXACT = ('dijkstra', 'astar')
+
+# Differences smaller than these are noise rather than regressions, however large the ratio.
+# A time also has to have got worse by more than its repeats were spread over (in the
+# baseline and in the new run together), so noisier measurements need bigger changes
+MIN_TIME_DIFFERENCE = 0.002
+MIN_MEMORY_DIFFERENCE = 64 * 1024
+
+# Tracing memory slows a search down more than ten times, which on the biggest maps
+# takes hours, so by default it is only done up to this size
+MEMORY_MAX_SIZE = 500
+
+# Times that look worse than the baseline are measured again up to this many times
+RECHECKS = 2
+
+# The baseline kept in the repo
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+
+
+# Make a map with the given generator, the same every time for the same seed
+def make_map(name, size, seed):
+    random.seed(seed)
+    if name == 'prim':
+        mazearray = prim(size, (0, 0), (0, 0), start_point=(0, 0), seed=seed)
+    elif name == 'better_prim':
+        mazearray = better_prim(size, (1, 1), (1, 1), start_point=(1, 1), seed=seed)
+    else:
+        mazearray = make_grid(size)
+        if name == 'recursive_division':
+            recursive_division(mazearray)
+        elif name == 'random_terrain':
+            random_terrain(mazearray)
+        elif name == 'eller':
+            eller(mazearray, seed=seed)
+        elif name == 'noise_terrain':
+            noise_terrain(mazearray, seed=seed)
+    # The prims put a start node on the maze, which place_endpoints moves
+    mazearray.fill('blank', mazearray.types == TYPE_CODES['start'])
+    mazearray.clear_visited()
+    return mazearray
+
+# The open cells nearest the top left and bottom right corners, made the start and end
+def place_endpoints(mazearray):
+    rows, columns = mazearray.shape
+    open_cells = np.argwhere(np.isfinite(mazearray.costs))
+    start = tuple(int(i) for i in open_cells[np.argmin(open_cells.sum(axis=1))])
+    end = tuple(int(i) for i in open_cells[np.argmin((rows - 1 - open_cells[:, 0]) + (columns - 1 - open_cells[:, 1]))])
+    mazearray.fill('start', start)
+    mazearray.fill('end', end)
+    return start, end
+
+def run_search(algorithm, mazearray, start, end, diagonals):
+    if algorithm in ('dijkstra', 'astar'):
+        return dijkstra(mazearray, start, end, diagonals=diagonals, astar=algorithm == 'astar')
+    return xfs(mazearray, start, end, algorithm[0], diagonals=diagonals)
+
+
+# A fixed bit of work much like a search's (heap operations, list reads and writes, arithmetic)
+# that doesn't use any of the code being benchmarked. Timing it next to each measurement shows
+# how fast the machine is running at the time, so the two runs being compared can be scaled
+# to the same speed (a busy or throttled machine slows both down alike)
+def reference_work(size=20000):
+    heap = []
+    best = [0] * size
+    for i in range(size):
+        heapq.heappush(heap, ((i * 7919) % size, i))
+    while heap:
+        distance, node = heapq.heappop(heap)
+        best[node] = distance + best[node - 1]
+
+def reference_time():
+    return timed(reference_work, 3)[1]
+
+# Call run repeat times with garbage collection off (as timeit does), returning its last
+# result and the best time and the spread (slowest - fastest) of the times. It is called once
+# more first without being timed, since the first call is often much slower (caches, memory
+# the process hasn't allocated yet)
+def timed(run, repeat):
+    run()
+    times = []
+    for _ in range(repeat):
+        gc.disable()
+        try:
+            started = time.perf_counter()
+            result = run()
+            times.append(time.perf_counter() - started)
+        finally:
+            gc.enable()
+    return result, min(times), max(times) - min(times)
+
+# Time a search (best of repeat runs), keeping the counts from its stats. With trace_memory
+# it is run once more to find its peak memory; tracing slows that run down a lot (over ten
+# times), but its time isn't used
+def measure(algorithm, mazearray, start, end, diagonals=False, repeat=3, trace_memory=True):
+    def run():
+        mazearray.clear_visited()
+        return run_search(algorithm, mazearray, start, end, diagonals)
+    stats, best, spread = timed(run, repeat)
+
+    peak_memory = None
+    if trace_memory:
+        mazearray.clear_visited()
+        tracemalloc.start()
+        run_search(algorithm, mazearray, start, end, diagonals)
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return {
+        'time': best,
+        'time_spread': spread,
+        'expanded': stats.expanded,
+        'pushes': stats.pushed,
+        'stale_pops': stats.stale_pops,
+        'max_frontier': stats.max_frontier,
+        'peak_memory': peak_memory,
+        'found': stats.found,
+        'path_length': stats.path_length,
+        'path_cost': stats.path_cost if stats.found else None,
+        'phases': dict(stats.times),
+    }
+
+# trace_memory can be True, False or 'auto' (up to MEMORY_MAX_SIZE)
+def run_benchmarks(maps=DEFAULT_MAPS, sizes=SIZES, algorithms=ALGORITHMS, seed=1, repeat=3, diagonals=False, trace_memory='auto', report=print):
+    results = []
+    for size in sizes:
+        trace = size <= MEMORY_MAX_SIZE if trace_memory == 'auto' else trace_memory
+        for name in maps:
+            reference = reference_time()
+            mazearray, best, spread = timed(lambda: make_map(name, size, seed), repeat)
+            result = {'map': name, 'size': size, 'algorithm': 'generate', 'time': best, 'time_spread': spread, 'reference_time': reference}
+            results.append(result)
+            report(format_result(result))
+
+            start, end = place_endpoints(mazearray)
+            # Build the search structures now so the first search isn't charged for them
+            mazearray.components(diagonals)
+            for algorithm in algorithms:
+                result = {'map': name, 'size': size, 'algorithm': algorithm, 'diagonals': diagonals, 'reference_time': reference_time()}
+                result.update(measure(algorithm, mazearray, start, end, diagonals, repeat, trace))
+                results.append(result)
+                report(format_result(result))
+    return results
+
+
+def key(result):
+    return (result['map'], result['size'], result['algorithm'], result.get('diagonals', False))
+
+# Everything in results that is worse than in the baseline by more than tolerance (a fraction), as messages
+# With timings=False only the counts are compared, not times or memory (e.g. for a baseline from another machine)
+def compare(results, baseline, tolerance=0.25, timings=True):
+    previous = {key(result): result for result in baseline}
+    regressions = []
+    for result in results:
+        old = previous.get(key(result))
+        if old is None:
+            continue
+        name = '{} {} {}'.format(*key(result)[:3])
+
+        if old.get('found') is not None and result.get('found') != old['found']:
+            regressions.append(f"{name}: found a path {old['found']} -> {result['found']}")
+        elif result['algorithm'] in EXACT and old.get('path_cost') is not None and abs(result['path_cost'] - old['path_cost']) > 1e-6:
+            regressions.append(f"{name}: path cost {old['path_cost']:.6g} -> {result['path_cost']:.6g}")
+
+        for metric in METRICS:
+            new_value, old_value = result.get(metric), old.get(metric)
+            if new_value is None or old_value is None:
+                continue
+            if metric in ('time', 'peak_memory') and not timings:
+                continue
+            if metric == 'time':
+                regression = time_regression(result, old, tolerance)
+                if regression:
+                    regressions.append(f"{name}: {regression}")
+                continue
+            if metric == 'peak_memory' and new_value - old_value < MIN_MEMORY_DIFFERENCE:
+                continue
+            if new_value > old_value * (1 + tolerance):
+                regressions.append(f"{name}: {metric} {old_value:.6g} -> {new_value:.6g} ({new_value / max(old_value, 1e-12):.2f}x)")
+    return regressions
+
+# A message if result's time is worse than old's by more than tolerance and by more than the noise, else None
+def time_regression(result, old, tolerance):
+    new_time, old_time = result['time'], old['time']
+    # Scaled down to the speed the machine was running at for the baseline if it is running slower now.
+    # The reference is noisy too, so it is never used to scale a time up
+    if old.get('reference_time') and result.get('reference_time', 0) > old['reference_time']:
+        new_time *= old['reference_time'] / result['reference_time']
+    if new_time - old_time < max(MIN_TIME_DIFFERENCE, old.get('time_spread', 0) + result.get('time_spread', 0)):
+        return None
+    if new_time > old_time * (1 + tolerance):
+        return f"time {old_time:.6g} -> {new_time:.6g} ({new_time / max(old_time, 1e-12):.2f}x)"
+    return None
+
+# Time one result's search (or generator) again, on a fresh copy of its map
+def remeasure(result, seed, repeat):
+    name, size, algorithm, diagonals = key(result)
+    if algorithm == 'generate':
+        reference = reference_time()
+        mazearray, best, spread = timed(lambda: make_map(name, size, seed), repeat)
+    else:
+        mazearray = make_map(name, size, seed)
+        start, end = place_endpoints(mazearray)
+        mazearray.components(diagonals)
+        reference = reference_time()
+        measured = measure(algorithm, mazearray, start, end, diagonals, repeat, trace_memory=False)
+        best, spread = measured['time'], measured['time_spread']
+    return {'time': best, 'time_spread': spread, 'reference_time': reference}
+
+# Measure the times that look worse than the baseline again (up to RECHECKS times), keeping the
+# fastest: a real slowdown shows up every time, but noise (which only ever slows things down)
+# rarely does twice running
+def recheck(results, baseline, seed=1, repeat=3, tolerance=0.25, report=print):
+    previous = {key(result): result for result in baseline}
+    for attempt in range(RECHECKS):
+        slow = [result for result in results if key(result) in previous and time_regression(result, previous[key(result)], tolerance)]
+        if not slow:
+            return
+        report(f"Measuring {len(slow)} slower time(s) again")
+        for result in slow:
+            again = remeasure(result, seed, repeat)
+            if again['time'] < result['time']:
+                result.update(again)
+
+def format_result(result):
+    line = f"{result['map']:<20}{result['size']:>6}  {result['algorithm']:<9}{result['time']:>10.4f}s"
+    if result['algorithm'] != 'generate':
+        memory = f"{result['peak_memory'] / 2**20:.1f}" if result['peak_memory'] is not None else '-'
+        line += (f"{result['expanded']:>10} expanded{result['pushes']:>10} pushes{memory:>9} MiB"
+                 f"  {'path ' + str(result['path_length']) if result['found'] else 'no path'}")
+    return line
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the searches and maze generators without a window.")
+    parser.add_argument('--maps', nargs='+', choices=MAPS, default=DEFAULT_MAPS)
+    parser.add_argument('--sizes', nargs='+', type=int, default=SIZES)
+    parser.add_argument('--algorithms', nargs='+', choices=ALGORITHMS, default=ALGORITHMS)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=3, help="time each search this many times and keep the best")
+    parser.add_argument('--diagonals', action='store_true')
+    parser.add_argument('--memory', action='store_true', help=f"measure peak memory at every size, not just up to {MEMORY_MAX_SIZE}")
+    parser.add_argument('--no-memory', action='store_true', help="skip measuring peak memory, which takes most of the time")
+    parser.add_argument('--output', default='benchmark.json', help="where to write the results")
+    parser.add_argument('--baseline', default=BASELINE, help="results file to compare against")
+    parser.add_argument('--no-baseline', action='store_true', help="don't compare against a baseline")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="how much worse (as a fraction) counts as a regression")
+    args = parser.parse_args(argv)
+
+    trace_memory = False if args.no_memory else True if args.memory else 'auto'
+    results = run_benchmarks(args.maps, args.sizes, args.algorithms, args.seed, args.repeat, args.diagonals, trace_memory)
+
+    baseline = None
+    if args.baseline and not args.no_baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        # Times and memory from another machine say nothing about this one
+        timings = baseline.get('machine') == platform.platform()
+        if timings:
+            recheck(results, baseline['results'], args.seed, args.repeat, args.tolerance)
+        else:
+            print(f"{args.baseline} is from another machine, so only its counts are compared")
+
+    with open(args.output, 'w') as file:
+        json.dump({
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.platform(),
+            'seed': args.seed,
+            'repeat': args.repeat,
+            'results': results,
+        }, file, indent=1)
+    print(f"Results written to {args.output}")
+
+    if baseline is not None:
+        regressions = compare(results, baseline['results'], args.tolerance, timings)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            print(f"{len(regressions)} regression(s) against {args.baseline}")
+            return 1
+        print(f"No regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
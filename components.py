@@ -0,0 +1,236 @@
+'''
+Connected components of the open cells, for telling when there is no path
+without searching.
+
+Every open cell gets a component label (and walls get 0), using the same
+padded flat ids as the adjacency index, so two cells are joined by some path
+exactly when their labels are the same. A search whose start and goal are in
+different components can give up straight away, instead of exploring all of
+the start's component first.
+
+The labels are kept up to date a cell at a time as the grid is edited:
+
+    opening a cell    joins the components around it, by pointing their
+                      labels at one of them (union-find), so it costs nothing
+    walling a cell    can only split its component. If the open cells around
+                      it are still joined to each other just around it, it
+                      hasn't; otherwise a search is grown from each side at
+                      once and stopped as soon as they meet, and any side that
+                      runs out of cells first is a piece of its own and is
+                      given a new label. Either way the cost depends on the
+                      smaller side, not on the size of the grid
+
+Bulk changes (generators, set_costs, ...) relabel the whole grid with a few
+vectorised passes: cells are joined into horizontal runs, and the runs into
+components by union-find over the runs that touch from one row to the next.
+'''
+import numpy as np
+from collections import deque
+from math import inf
+
+# The eight cells around a cell, as (row, column) offsets
+AROUND = ((1,0), (-1,0), (0,1), (0,-1), (1,1), (1,-1), (-1,1), (-1,-1))
+
+
+class Components():
+    def __init__(self, adjacency):
+        self.adjacency = adjacency
+        # Component label of each flat id (0 for walls and the padding), as an int32 array:
+        # it is only read a couple of times per query, and a list would take ~20 times the memory
+        self.labels = None
+        # Labels that have been joined to another, pointing at it (union-find)
+        self.merged = {}
+        # Labels given out after a full relabel start above every flat id, so they never clash
+        self.next_label = adjacency.size
+        # Number of components
+        self.count = 0
+        self.version = None
+
+        width = adjacency.width
+        self.around = tuple(dr * width + dc for dr, dc in AROUND)
+
+    # Relabel every cell from a (rows, columns) array saying which cells are open
+    def rebuild(self, walkable):
+        adjacency = self.adjacency
+        padded = np.zeros((adjacency.rows + 2, adjacency.width), dtype=bool)
+        padded[1:-1, 1:-1] = walkable
+        flat = padded.ravel()
+
+        # Number the horizontal runs of open cells (the padding means none of them wrap onto the next row)
+        # (int32 throughout, which halves the memory the relabel needs on big grids)
+        starts = flat.copy()
+        starts[1:] &= ~flat[:-1]
+        run = np.cumsum(starts, dtype=np.int32) - 1
+        first = np.flatnonzero(starts).astype(np.int32)
+        cells = np.flatnonzero(flat).astype(np.int32)
+
+        # Pairs of runs joined by a move from one row down to the next
+        down = [offset for offset in adjacency.offsets if offset > 1]
+        a = np.concatenate([run[cells[flat[cells + offset]]] for offset in down])
+        b = np.concatenate([run[cells[flat[cells + offset]] + offset] for offset in down])
+
+        # Hook every root onto the smallest root it touches, then flatten the trees, until no pair is left
+        # in two different components. Each round at least halves the number of components
+        roots = np.arange(len(first), dtype=np.int32)
+        while len(a):
+            root_a, root_b = roots[a], roots[b]
+            apart = root_a != root_b
+            a, b, root_a, root_b = a[apart], b[apart], root_a[apart], root_b[apart]
+            if not len(a):
+                break
+            np.minimum.at(roots, np.maximum(root_a, root_b), np.minimum(root_a, root_b))
+            while True:
+                flattened = roots[roots]
+                if (flattened == roots).all():
+                    break
+                roots = flattened
+
+        # Each component is labelled with the flat id of the first cell of its root run
+        labels = np.zeros(len(flat), dtype=np.int32)
+        labels[cells] = first[roots[run[cells]]]
+        self.labels = labels
+        self.merged = {}
+        self.next_label = adjacency.size
+        self.count = int((roots == np.arange(len(roots))).sum())
+
+    # The label a label has been merged into, if any (with path compression)
+    def find(self, label):
+        merged = self.merged
+        root = label
+        while root in merged:
+            root = merged[root]
+        while label != root:
+            parent = merged[label]
+            merged[label] = root
+            label = parent
+        return root
+
+    # Component label of a (row, column) cell, or None for a wall
+    def label(self, row, column):
+        label = int(self.labels[self.adjacency.index(row, column)])
+        return self.find(label) if label else None
+
+    # True if both cells are open and some path joins them
+    def connected(self, a, b):
+        label = self.label(*a)
+        return label is not None and label == self.label(*b)
+
+    # True if both cells are open but no path joins them, so a search from one can't reach the other
+    # (a search from a wall may still step off it, so walls are never ruled out here)
+    def separated(self, a, b):
+        a, b = self.label(*a), self.label(*b)
+        return a is not None and b is not None and a != b
+
+    # Bring a single cell up to date after its cost has changed
+    def update_cell(self, row, column):
+        node = self.adjacency.index(row, column)
+        is_open = self.adjacency.costs[node] != inf
+        if is_open and not self.labels[node]:
+            self.open(node)
+        elif not is_open and self.labels[node]:
+            self.close(node)
+
+    # A wall has been removed: join the components around it
+    def open(self, node):
+        labels = self.labels
+        roots = {self.find(int(labels[node + offset])) for offset in self.adjacency.offsets if labels[node + offset]}
+        if not roots:
+            labels[node] = self.next_label
+            self.next_label += 1
+            self.count += 1
+            return
+        root = roots.pop()
+        labels[node] = root
+        for other in roots:
+            self.merged[other] = root
+        self.count -= len(roots)
+
+    # A wall has been added: split its component if that cuts it in two (or more)
+    def close(self, node):
+        labels = self.labels
+        offsets = self.adjacency.offsets
+        labels[node] = 0
+
+        neighbours = [node + offset for offset in offsets if labels[node + offset]]
+        if not neighbours:
+            self.count -= 1
+            return
+
+        # Group the neighbours that are still joined by the open cells right around the wall.
+        # Neighbours in the same group are certainly still connected, so only one from each
+        # group needs searching from
+        around = {node + offset for offset in self.around if labels[node + offset]}
+        sides = []
+        seen = set()
+        for neighbour in neighbours:
+            if neighbour in seen:
+                continue
+            sides.append(neighbour)
+            seen.add(neighbour)
+            stack = [neighbour]
+            while stack:
+                cell = stack.pop()
+                for offset in offsets:
+                    other = cell + offset
+                    if other in around and other not in seen:
+                        seen.add(other)
+                        stack.append(other)
+
+        if len(sides) > 1:
+            self.split(sides)
+
+    # Grow a breadth first search from each side at once, a cell at a time in turn. Searches that meet
+    # are joined, and one that runs out of cells has found a whole component, which gets a new label.
+    # Stops once only one search is left, which keeps the old label
+    def split(self, sides):
+        labels = self.labels
+        offsets = self.adjacency.offsets
+        owner = {side: i for i, side in enumerate(sides)}
+        # Each side's frontier and the cells it has reached (None once it has been joined to another side or finished)
+        searches = [(deque([side]), [side]) for side in sides]
+        joined = list(range(len(sides)))
+        remaining = len(sides)
+
+        def side_of(i):
+            while joined[i] != i:
+                i = joined[i]
+            return i
+
+        while remaining > 1:
+            for i, search in enumerate(searches):
+                if search is None:
+                    continue
+                frontier, reached = search
+
+                if not frontier:
+                    label = self.next_label
+                    self.next_label += 1
+                    labels[reached] = label
+                    self.count += 1
+                    searches[i] = None
+                    remaining -= 1
+                    if remaining == 1:
+                        break
+                    continue
+
+                cell = frontier.popleft()
+                for offset in offsets:
+                    neighbour = cell + offset
+                    if not labels[neighbour]:
+                        continue
+                    j = owner.get(neighbour)
+                    if j is None:
+                        owner[neighbour] = i
+                        frontier.append(neighbour)
+                        reached.append(neighbour)
+                        continue
+                    j = side_of(j)
+                    if j != i:
+                        other_frontier, other_reached = searches[j]
+                        frontier.extend(other_frontier)
+                        reached.extend(other_reached)
+                        joined[j] = i
+                        searches[j] = None
+                        remaining -= 1
+                if remaining == 1:
+                    break
@@ -0,0 +1,188 @@
+'''
+Flow fields: the route from every cell to one goal.
+
+A single dijkstra search backwards from the goal gives the distance from every
+cell to the goal, and the direction of the first step along the shortest route
+from it. Any number of agents heading for that goal can then look up their next
+step in O(1), instead of each needing a search of its own.
+
+Calling update() again after cells have been edited only recalculates the cells
+whose route went through an edited cell (and anything that can now get to the
+goal more cheaply), rather than the whole field.
+'''
+import heapq
+import numpy as np
+from math import inf
+from array_grid import COLORS
+from adjacency import STRAIGHT, DIAGONAL
+
+# Colours used by shade(): cells near the goal get their visited colour, fading to their regular colour far away
+NEAR_COLORS = COLORS[1].astype(np.float32)
+FAR_COLORS = COLORS[0].astype(np.float32)
+
+
+class FlowField():
+    def __init__(self, mazearray, diagonals=False):
+        self.mazearray = mazearray
+        self.diagonals = diagonals
+        # (row, column) step for each value in the direction array
+        self.directions = STRAIGHT + DIAGONAL if diagonals else STRAIGHT
+
+        self.adjacency = None
+        self.version = None
+        self.goal = None
+
+        # Distance to the goal, and the flat id of the next cell on the way there (-1 for none), of every cell
+        self.g = None
+        self.toward = None
+
+        self.arrays = None
+
+    # Make the field lead to goal_point, with the grid as it is now
+    def update(self, goal_point):
+        mazearray = self.mazearray
+        adjacency = mazearray.adjacency(self.diagonals)
+        goal = adjacency.index(*goal_point)
+        changes = mazearray.changes_since(self.version)
+
+        if adjacency is not self.adjacency or goal != self.goal or changes is None:
+            self.adjacency = adjacency
+            self.goal = goal
+            self.g = [inf] * adjacency.size
+            self.toward = [-1] * adjacency.size
+            if adjacency.costs[goal] != inf:
+                self.g[goal] = 0
+                self.propagate([(0, goal)])
+        elif changes:
+            self.repair(changes)
+
+        self.version = mazearray.version
+        self.arrays = None
+        return self
+
+    # Dijkstra backwards from the queued cells: a cell's distance is the cost of
+    # stepping out of it into its neighbour plus the neighbour's distance
+    def propagate(self, heap):
+        adjacency = self.adjacency
+        costs = adjacency.costs
+        exits = adjacency.exits
+        moves = adjacency.moves
+        g, toward = self.g, self.toward
+
+        while heap:
+            distance, node = heapq.heappop(heap)
+            if distance > g[node]:
+                continue
+            cost = costs[node]
+            for offset, step in moves:
+                neighbour = node + offset
+                if costs[neighbour] == inf:
+                    continue
+                neighbour_distance = distance + step * (cost + exits[neighbour])
+                if neighbour_distance < g[neighbour]:
+                    g[neighbour] = neighbour_distance
+                    toward[neighbour] = node
+                    heapq.heappush(heap, (neighbour_distance, neighbour))
+
+    # Recalculate the part of the field affected by the changed cells
+    def repair(self, changes):
+        adjacency = self.adjacency
+        costs = adjacency.costs
+        g, toward = self.g, self.toward
+
+        changed = {adjacency.index(row, column) for row, column in changes}
+        if self.goal in changed:
+            self.version = None
+            return self.update(adjacency.cell(self.goal))
+
+        # Every changed cell, and every cell whose route steps into one (directly
+        # or further along), has an out of date distance
+        affected = set(changed)
+        stack = list(changed)
+        while stack:
+            node = stack.pop()
+            for offset in adjacency.offsets:
+                neighbour = node + offset
+                if toward[neighbour] == node and neighbour not in affected:
+                    affected.add(neighbour)
+                    stack.append(neighbour)
+        for node in affected:
+            g[node] = inf
+            toward[node] = -1
+
+        # Start them off from their best neighbour, and let the changed cells pass
+        # on any routes that have become cheaper
+        heap = []
+        for node in affected | changed:
+            if costs[node] == inf:
+                continue
+            leave = adjacency.exits[node]
+            for offset, step in adjacency.moves:
+                neighbour = node + offset
+                distance = g[neighbour] + step * (costs[neighbour] + leave)
+                if distance < g[node]:
+                    g[node] = distance
+                    toward[node] = neighbour
+            if g[node] != inf:
+                heap.append((g[node], node))
+        heapq.heapify(heap)
+        self.propagate(heap)
+
+    # The next cell on the shortest route from (row, column) to the goal, or None at the goal or if there is no route
+    def next_step(self, row, column):
+        adjacency = self.adjacency
+        node = self.toward[adjacency.index(row, column)]
+        return adjacency.cell(node) if node != -1 else None
+
+    # The whole route from start_point to the goal as (row, column) cells, or [] if there isn't one
+    def route(self, start_point):
+        adjacency = self.adjacency
+        toward = self.toward
+        node = adjacency.index(*start_point)
+        if self.g[node] == inf:
+            return []
+        path = [adjacency.cell(node)]
+        while node != self.goal:
+            node = toward[node]
+            path.append(adjacency.cell(node))
+        return path
+
+    # distance and direction arrays, worked out from the flat lists when first asked for
+    def get_arrays(self):
+        if self.arrays is None:
+            adjacency = self.adjacency
+            rows, columns = adjacency.rows, adjacency.columns
+            inner = (slice(1, -1), slice(1, -1))
+
+            distance = np.array(self.g).reshape(rows + 2, adjacency.width)[inner]
+
+            # Turn the flat id of each cell's next step into an index into self.directions
+            toward = np.array(self.toward).reshape(rows + 2, adjacency.width)
+            ids = np.arange(adjacency.size).reshape(rows + 2, adjacency.width)
+            offsets = np.array(adjacency.offsets)
+            order = np.argsort(offsets)
+            moved = (toward - ids)[inner]
+            found = np.clip(np.searchsorted(offsets[order], moved), 0, len(offsets) - 1)
+            direction = np.where(toward[inner] == -1, -1, order[found]).astype(np.int8)
+
+            self.arrays = (distance, direction)
+        return self.arrays
+
+    # Distance from every cell to the goal (inf where there is no route), as a (rows, columns) array
+    @property
+    def distance(self):
+        return self.get_arrays()[0]
+
+    # Index into self.directions of every cell's next step (-1 at the goal and where there is no route)
+    @property
+    def direction(self):
+        return self.get_arrays()[1]
+
+    # (rows, columns, 3) array of colours for drawing the field, using the node colour palette
+    def shade(self):
+        distance = self.distance
+        reachable = np.isfinite(distance)
+        furthest = distance[reachable].max() if reachable.any() else 1
+        fade = np.where(reachable, distance / max(furthest, 1), 1)[..., np.newaxis]
+        types = self.mazearray.types
+        return (NEAR_COLORS[types] * (1 - fade) + FAR_COLORS[types] * fade).astype(np.uint8)
@@ -0,0 +1,370 @@
+'''
+Hierarchical pathfinding (HPA*).
+
+The grid is split into square clusters. Wherever two neighbouring clusters
+share an open stretch of border, one or two cells on each side are picked as
+entrances, and the entrances form an abstract graph: entrances across a border
+are joined by a single step, and entrances in the same cluster by the shortest
+distance between them inside that cluster. A query searches the abstract graph
+and then fills in the cells between its nodes, so its cost depends on how many
+clusters the path crosses rather than on the size of the grid.
+
+Distances inside a cluster are worked out the first time the search needs them
+and cached. Editing a cell only throws away the cache of the cluster(s) it
+affects, so the rest of the abstract graph survives between queries.
+
+Paths are close to, but not always exactly, the shortest: they have to pass
+through the chosen entrances.
+'''
+import time
+import heapq
+import numpy as np
+from math import inf
+from pathfinding import NULL_OBSERVER, distance_estimate, render_clock
+from search_stats import SearchStats
+
+# Open stretches of border at least this long get an entrance at each end rather than one in the middle
+LONG_ENTRANCE = 6
+
+
+class HierarchicalPlanner():
+    def __init__(self, mazearray, cluster_size=10, diagonals=False):
+        self.mazearray = mazearray
+        self.cluster_size = cluster_size
+        self.diagonals = diagonals
+
+        self.adjacency = None
+        self.version = None
+
+        # Entrance pairs (flat ids either side of a cluster border) for each
+        # stretch of border, keyed by ('v' or 'h', cluster row, cluster column)
+        self.borders = {}
+        # For each entrance, the entrances across the border from it and the step between them
+        self.partners = {}
+        # Entrances of each cluster, keyed by (cluster row, cluster column)
+        self.entrances = {}
+        # Cached searches from each entrance within its own cluster, per cluster
+        self.trees = {}
+
+        # The last path found, as (row, column) cells from start to goal
+        self.path = []
+
+    # Find a path from start_point to goal_point through the abstract graph
+    # Marks expanded entrances as visited and the path as the path, and returns a SearchStats like the
+    # searches in pathfinding.py and takes the same callbacks (the nodes expanded and pushed are entrances)
+    def plan(self, start_point, goal_point, observer=None, on_expand=None, on_push=None, on_path=None):
+        started = time.perf_counter()
+        stats = SearchStats()
+        times = stats.times
+        observer = observer or NULL_OBSERVER
+        clock = render_clock(observer)
+        mazearray = self.mazearray
+
+        self.update()
+        adjacency = self.adjacency
+        costs = adjacency.costs
+
+        start = adjacency.index(*start_point)
+        goal = adjacency.index(*goal_point)
+
+        for row, column in self.path:
+            mazearray.path_stamps[row, column] = 0
+            observer.cell_changed(mazearray, row, column, animate=False)
+        self.path = []
+
+        if costs[start] == inf or costs[goal] == inf or mazearray.components(self.diagonals).separated(start_point, goal_point):
+            observer.refresh(mazearray)
+            times['init'] = time.perf_counter() - started
+            return stats
+
+        search_started = time.perf_counter()
+        times['init'] = search_started - started
+        nodes, distance, expanded = self.search(start, goal, stats, on_push)
+        stats.expanded = len(expanded)
+
+        clock.pause()
+        for node in expanded:
+            row, column = adjacency.cell(node)
+            if on_expand is not None:
+                on_expand(row, column)
+            mazearray.visited_stamps[row, column] = mazearray.epoch
+            observer.cell_changed(mazearray, row, column)
+        clock.resume()
+        searched = time.perf_counter()
+        clock.split(times, search_started, searched)
+
+        if nodes:
+            self.path = [adjacency.cell(node) for node in self.refine(nodes)]
+            stats.found = True
+            stats.path = self.path
+            stats.path_cost = distance
+        for row, column in self.path:
+            mazearray.path_stamps[row, column] = mazearray.epoch
+            observer.cell_changed(mazearray, row, column, animate=False)
+        observer.refresh(mazearray)
+        times['traceback'] = time.perf_counter() - searched
+
+        if stats.found and on_path is not None:
+            on_path(stats.path)
+        return stats
+
+    # Bring the abstract graph up to date with the grid, rebuilding only what changed cells affect
+    # and doing nothing at all if the grid hasn't changed
+    def update(self):
+        mazearray = self.mazearray
+        adjacency = mazearray.adjacency(self.diagonals)
+        if adjacency is self.adjacency and self.version == mazearray.version:
+            return
+        changes = mazearray.changes_since(self.version)
+
+        if adjacency is not self.adjacency or changes is None:
+            self.adjacency = adjacency
+            self.rebuild()
+        else:
+            size = self.cluster_size
+            rows, columns = mazearray.shape
+            dirty_borders = set()
+            dirty_clusters = set()
+            for row, column in changes:
+                dirty_clusters.add((row // size, column // size))
+                # Entrances across a border depend on the cells either side of it,
+                # and diagonal ones on the row (or column) after as well
+                for border_row in {row // size, max(row - 1, 0) // size}:
+                    if column % size == size - 1 and column + 1 < columns:
+                        dirty_borders.add(('v', border_row, column // size))
+                    if column % size == 0 and column > 0:
+                        dirty_borders.add(('v', border_row, column // size - 1))
+                for border_column in {column // size, max(column - 1, 0) // size}:
+                    if row % size == size - 1 and row + 1 < rows:
+                        dirty_borders.add(('h', row // size, border_column))
+                    if row % size == 0 and row > 0:
+                        dirty_borders.add(('h', row // size - 1, border_column))
+
+            for border in dirty_borders:
+                dirty_clusters.update(self.find_entrances(border, mazearray.costs))
+            for cluster in dirty_clusters:
+                self.trees.pop(cluster, None)
+
+        self.version = mazearray.version
+
+    # Throw away the whole abstract graph and find the entrances on every border again
+    def rebuild(self):
+        self.borders = {}
+        self.partners = {}
+        self.entrances = {}
+        self.trees = {}
+
+        size = self.cluster_size
+        rows, columns = self.mazearray.shape
+        costs = self.mazearray.costs
+        cluster_rows = -(-rows // size)
+        cluster_columns = -(-columns // size)
+        for cluster_row in range(cluster_rows):
+            for cluster_column in range(cluster_columns):
+                if cluster_column + 1 < cluster_columns:
+                    self.find_entrances(('v', cluster_row, cluster_column), costs)
+                if cluster_row + 1 < cluster_rows:
+                    self.find_entrances(('h', cluster_row, cluster_column), costs)
+
+    # Replace the entrances on one stretch of border, returning the clusters whose entrances changed
+    # costs is the grid's costs array, of which only the cells either side of the border are read
+    def find_entrances(self, border, costs):
+        direction, cluster_row, cluster_column = border
+        size = self.cluster_size
+
+        # Look at vertical and horizontal borders the same way, as a pair of
+        # columns (before, after) running along the border
+        if direction == 'h':
+            costs = costs.T
+            cluster_row, cluster_column = cluster_column, cluster_row
+        length = costs.shape[0]
+        start = cluster_row * size
+        stop = min(start + size, length)
+        column = (cluster_column + 1) * size
+        before = np.isfinite(costs[start:min(stop + 1, length), column - 1])
+        after = np.isfinite(costs[start:min(stop + 1, length), column])
+
+        pairs = []
+        run = []
+        for offset in range(stop - start + 1):
+            if offset < stop - start and before[offset] and after[offset]:
+                run.append(offset)
+                continue
+            if len(run) >= LONG_ENTRANCE:
+                pairs += [((run[0], -1), (run[0], 0)), ((run[-1], -1), (run[-1], 0))]
+            elif run:
+                middle = run[len(run) // 2]
+                pairs.append(((middle, -1), (middle, 0)))
+            run = []
+
+        # A diagonal step squeezing between two walls across the border can't be
+        # replaced by straight steps through an entrance, so it needs its own. Steps
+        # across a cluster corner are on two borders, and only the vertical one keeps them
+        if self.diagonals:
+            last = min(stop - start, len(before) - 1) if direction == 'v' else stop - start - 1
+            for offset in range(last):
+                if before[offset] and after[offset + 1] and not after[offset] and not before[offset + 1]:
+                    pairs.append(((offset, -1), (offset + 1, 0)))
+                if before[offset + 1] and after[offset] and not before[offset] and not after[offset + 1]:
+                    pairs.append(((offset + 1, -1), (offset, 0)))
+
+        adjacency = self.adjacency
+        nodes = []
+        for a, b in pairs:
+            cells = [(start + a[0], column + a[1]), (start + b[0], column + b[1])]
+            if direction == 'h':
+                cells = [(cell_column, cell_row) for cell_row, cell_column in cells]
+            nodes.append(tuple(adjacency.index(*cell) for cell in cells))
+
+        changed = set()
+        for a, b in self.borders.get(border, ()):
+            self.unlink(a, b)
+            changed.update((self.cluster(a), self.cluster(b)))
+        self.borders[border] = nodes
+        for a, b in nodes:
+            self.link(a, b)
+            changed.update((self.cluster(a), self.cluster(b)))
+        return changed
+
+    # Join two entrances across a border
+    def link(self, a, b):
+        row_a, column_a = divmod(a, self.adjacency.width)
+        row_b, column_b = divmod(b, self.adjacency.width)
+        step = 1 if row_a == row_b or column_a == column_b else 2**0.5
+        for node, other in ((a, b), (b, a)):
+            self.partners.setdefault(node, {})[other] = step
+            self.entrances.setdefault(self.cluster(node), set()).add(node)
+
+    def unlink(self, a, b):
+        for node, other in ((a, b), (b, a)):
+            partners = self.partners.get(node, {})
+            partners.pop(other, None)
+            if not partners:
+                self.partners.pop(node, None)
+                self.entrances.get(self.cluster(node), set()).discard(node)
+
+    # (cluster row, cluster column) of a flat id
+    def cluster(self, node):
+        row, column = self.adjacency.cell(node)
+        return (row // self.cluster_size, column // self.cluster_size)
+
+    # Dijkstra from node that stays inside its cluster, returning the distance and parent of each cell it reaches
+    def cluster_search(self, node):
+        adjacency = self.adjacency
+        costs = adjacency.costs
+        exits = adjacency.exits
+        width = adjacency.width
+        size = self.cluster_size
+        cluster_row, cluster_column = self.cluster(node)
+        # Bounds in padded coordinates
+        top, left = cluster_row * size + 1, cluster_column * size + 1
+        bottom, right = top + size, left + size
+
+        distances = {node: 0}
+        parents = {node: None}
+        queue = [(0, node)]
+        while queue:
+            distance, current = heapq.heappop(queue)
+            if distance > distances[current]:
+                continue
+            leave = exits[current]
+            for offset, step in adjacency.moves:
+                neighbour = current + offset
+                if costs[neighbour] == inf:
+                    continue
+                row, column = divmod(neighbour, width)
+                if not (top <= row < bottom and left <= column < right):
+                    continue
+                neighbour_distance = distance + step * (costs[neighbour] + leave)
+                if neighbour_distance < distances.get(neighbour, inf):
+                    distances[neighbour] = neighbour_distance
+                    parents[neighbour] = current
+                    heapq.heappush(queue, (neighbour_distance, neighbour))
+        return distances, parents
+
+    # The cached search from an entrance (or a one-off search from any other cell)
+    def tree(self, node):
+        if node not in self.partners:
+            return self.cluster_search(node)
+        trees = self.trees.setdefault(self.cluster(node), {})
+        tree = trees.get(node)
+        if tree is None:
+            tree = trees[node] = self.cluster_search(node)
+        return tree
+
+    # A* over the abstract graph, returning its nodes from start to goal, the distance and the nodes expanded
+    # Counts its pushes, stale pops and largest frontier in stats
+    def search(self, start, goal, stats, on_push=None):
+        width = self.adjacency.width
+        scale = self.adjacency.heuristic_scale
+        goal_row, goal_column = divmod(goal, width)
+        goal_cluster = self.cluster(goal)
+
+        g = {start: 0}
+        parent = {start: None}
+        # Ties on priority go to the node furthest from the start, which heads
+        # straight for the goal instead of widening the search
+        queue = [(0, 0, start)]
+        expanded = []
+        start_tree = self.tree(start)
+        stats.pushed = 1
+        if on_push is not None:
+            on_push(*self.adjacency.cell(start))
+
+        while queue:
+            if len(queue) > stats.max_frontier:
+                stats.max_frontier = len(queue)
+            priority, distance, node = heapq.heappop(queue)
+            distance = -distance
+            if distance > g[node]:
+                stats.stale_pops += 1
+                continue
+            expanded.append(node)
+
+            if node == goal:
+                nodes = []
+                while node is not None:
+                    nodes.append(node)
+                    node = parent[node]
+                nodes.reverse()
+                return nodes, distance, expanded
+
+            cluster = self.cluster(node)
+            distances = (start_tree if node == start else self.tree(node))[0]
+            neighbours = [(other, distances[other]) for other in self.entrances.get(cluster, ()) if other in distances]
+            if cluster == goal_cluster and goal in distances:
+                neighbours.append((goal, distances[goal]))
+            costs = self.adjacency.costs
+            leave = self.adjacency.exits[node]
+            for other, step in self.partners.get(node, {}).items():
+                neighbours.append((other, step * (costs[other] + leave)))
+
+            for other, cost in neighbours:
+                other_distance = distance + cost
+                if other_distance < g.get(other, inf):
+                    g[other] = other_distance
+                    parent[other] = node
+                    row, column = divmod(other, width)
+                    heuristic = scale * distance_estimate(abs(goal_row - row), abs(goal_column - column), self.diagonals)
+                    heapq.heappush(queue, (other_distance + heuristic, -other_distance, other))
+                    stats.pushed += 1
+                    if on_push is not None:
+                        on_push(*self.adjacency.cell(other))
+
+        return [], inf, expanded
+
+    # Fill in the cells between consecutive abstract nodes
+    def refine(self, nodes):
+        path = [nodes[0]]
+        for a, b in zip(nodes, nodes[1:]):
+            if b in self.partners.get(a, ()) and self.cluster(a) != self.cluster(b):
+                path.append(b)
+                continue
+            parents = self.tree(a)[1]
+            segment = []
+            node = b
+            while node != a:
+                segment.append(node)
+                node = parents[node]
+            path += reversed(segment)
+        return path
@@ -0,0 +1,307 @@
+'''
+Incremental replanning for dijkstra/A* (D* Lite).
+
+DStarLite keeps its search state between calls to plan(), so after a few cells
+have been edited or the start point has been dragged it only repairs the part
+of the shortest path tree that the change affects, rather than searching the
+whole grid again.
+
+The search runs backwards from the goal, so moving the start point is cheap.
+Moving the goal (or changing large parts of the grid at once) throws the search
+away. Building it again costs several times as much as a plain A* search, which
+would be wasted while the goal is being dragged about, so until the goal stays
+put for a second call plan() just runs dijkstra/A* forwards from the start.
+'''
+import time
+import heapq
+from math import inf
+from pathfinding import NULL_OBSERVER, render_clock, dijkstra
+from search_stats import SearchStats
+
+# Keys built from sqrt(2) steps can be off by rounding error, so nodes whose key
+# is within this of the start's key are treated as ties and processed as well
+KEY_EPSILON = 1e-9
+
+
+class DStarLite():
+    def __init__(self, mazearray, diagonals=False, astar=True):
+        self.mazearray = mazearray
+        self.diagonals = diagonals
+        self.astar = astar
+
+        self.adjacency = None
+        self.version = None
+        self.start = None
+        self.goal = None
+        # False until the search has been built for the current goal
+        self.seeded = False
+        self.km = 0
+        # Heuristic multiplier, fixed for the life of a search
+        self.scale = 1
+
+        # g is the current distance estimate to the goal and rhs the one-step
+        # lookahead; nodes where they differ are waiting in the queue
+        self.g = None
+        self.rhs = None
+        self.touched = []
+        self.queue = []
+        self.queued = {}
+
+        # The last path found, as (row, column) cells from start to goal
+        self.path = []
+        # The stats of the call to plan() in progress, and its on_push callback
+        self.stats = SearchStats()
+        self.on_push = None
+
+    # Find the shortest path from start_point to goal_point, reusing as much of the previous search as possible
+    # Marks expanded nodes as visited and the path as the path, and returns a SearchStats like the searches
+    # in pathfinding.py (counting only the work this call did) and takes the same callbacks
+    def plan(self, start_point, goal_point, observer=None, on_expand=None, on_push=None, on_path=None):
+        started = time.perf_counter()
+        stats = self.stats = SearchStats()
+        times = stats.times
+        self.on_push = on_push
+        observer = observer or NULL_OBSERVER
+        clock = render_clock(observer)
+        mazearray = self.mazearray
+
+        adjacency = mazearray.adjacency(self.diagonals)
+        if adjacency is not self.adjacency:
+            self.adjacency = adjacency
+            self.g = [inf] * adjacency.size
+            self.rhs = [inf] * adjacency.size
+            self.touched = []
+            self.version = None
+
+        start = adjacency.index(*start_point)
+        goal = adjacency.index(*goal_point)
+        changes = mazearray.changes_since(self.version)
+
+        # A cell cheaper than any before would make the search's heuristic overestimate, so that starts again too.
+        # The new search is only built once the goal is the same as last time
+        if goal != self.goal or changes is None or adjacency.heuristic_scale < self.scale:
+            self.goal = goal
+            self.seeded = False
+            self.scale = adjacency.heuristic_scale
+            self.version = mazearray.version
+            self.unmark_path(observer)
+            stats = self.stats = dijkstra(mazearray, start_point, goal_point, diagonals=self.diagonals, astar=self.astar,
+                                          observer=observer, on_expand=on_expand, on_push=on_push, on_path=on_path)
+            self.path = stats.path
+            self.on_push = None
+            return stats
+        if not self.seeded:
+            self.reset(start, goal)
+            self.seeded = True
+        else:
+            if start != self.start:
+                self.km += self.heuristic(self.start, start)
+                self.start = start
+
+            # A changed cell alters the cost of every edge into and out of it, so
+            # the cell and all of its neighbours need their lookahead recalculating
+            for row, column in changes:
+                node = adjacency.index(row, column)
+                self.update_vertex(node)
+                for offset in adjacency.offsets:
+                    self.update_vertex(node + offset)
+
+        self.version = mazearray.version
+
+        # With the start and goal in different components there is no path, and the repair
+        # can wait until there is one to find (the changes are already in the queue)
+        separated = mazearray.components(self.diagonals).separated(start_point, goal_point)
+
+        search_started = time.perf_counter()
+        times['init'] = search_started - started
+        expanded = [] if separated else self.compute_shortest_path()
+        stats.expanded = len(expanded)
+
+        clock.pause()
+        for node in expanded:
+            row, column = adjacency.cell(node)
+            if on_expand is not None:
+                on_expand(row, column)
+            mazearray.visited_stamps[row, column] = mazearray.epoch
+            observer.cell_changed(mazearray, row, column)
+
+        self.unmark_path(observer)
+        clock.resume()
+        searched = time.perf_counter()
+        clock.split(times, search_started, searched)
+
+        self.path = [] if separated else self.extract_path()
+        for row, column in self.path:
+            mazearray.path_stamps[row, column] = mazearray.epoch
+            observer.cell_changed(mazearray, row, column, animate=False)
+        observer.refresh(mazearray)
+        times['traceback'] = time.perf_counter() - searched
+
+        self.on_push = None
+        if self.path:
+            stats.found = True
+            stats.path = self.path
+            stats.path_cost = self.g[start]
+            if on_path is not None:
+                on_path(stats.path)
+        return stats
+
+    # Take the last path off the grid
+    def unmark_path(self, observer):
+        mazearray = self.mazearray
+        for row, column in self.path:
+            mazearray.path_stamps[row, column] = 0
+            observer.cell_changed(mazearray, row, column, animate=False)
+
+    # Throw away the previous search and start again with a new start and goal
+    def reset(self, start, goal):
+        g, rhs = self.g, self.rhs
+        for node in self.touched:
+            g[node] = inf
+            rhs[node] = inf
+        self.touched = [goal]
+        self.queue = []
+        self.queued = {}
+        self.km = 0
+        self.scale = self.adjacency.heuristic_scale
+        self.start = start
+        self.goal = goal
+
+        rhs[goal] = 0
+        self.push(goal, self.calculate_key(goal))
+
+    # Distance estimate between two nodes (0 when running as dijkstra)
+    def heuristic(self, a, b):
+        if not self.astar:
+            return 0
+        width = self.adjacency.width
+        dr = abs(a // width - b // width)
+        dc = abs(a % width - b % width)
+        return self.scale * (dr + dc if not self.diagonals else dr + dc + (2**0.5 - 2) * min(dr, dc))
+
+    def calculate_key(self, node):
+        best = min(self.g[node], self.rhs[node])
+        return (best + self.heuristic(self.start, node) + self.km, best)
+
+    def push(self, node, key):
+        self.queued[node] = key
+        heapq.heappush(self.queue, (key, node))
+        stats = self.stats
+        stats.pushed += 1
+        if len(self.queued) > stats.max_frontier:
+            stats.max_frontier = len(self.queued)
+        if self.on_push is not None:
+            self.on_push(*self.adjacency.cell(node))
+
+    # The smallest key in the queue, dropping entries that have since been updated or removed
+    def top_key(self):
+        queue, queued = self.queue, self.queued
+        while queue and queued.get(queue[0][1]) != queue[0][0]:
+            heapq.heappop(queue)
+            self.stats.stale_pops += 1
+        return queue[0][0] if queue else (inf, inf)
+
+    # Recalculate the one-step lookahead of a node and put it in (or take it out of) the queue
+    def update_vertex(self, node):
+        adjacency = self.adjacency
+        costs = adjacency.costs
+        g, rhs = self.g, self.rhs
+
+        if node != self.goal:
+            best = inf
+            # Walls (and the padding around the grid) can never be on a path
+            if costs[node] != inf:
+                leave = adjacency.exits[node]
+                for offset, step in adjacency.moves:
+                    neighbour = node + offset
+                    distance = step * (costs[neighbour] + leave) + g[neighbour]
+                    if distance < best:
+                        best = distance
+            if best != rhs[node]:
+                if rhs[node] == inf and g[node] == inf:
+                    self.touched.append(node)
+                rhs[node] = best
+
+        if g[node] != rhs[node]:
+            self.push(node, self.calculate_key(node))
+        else:
+            self.queued.pop(node, None)
+
+    # Repair g until the start node is locally consistent, returning the nodes expanded
+    def compute_shortest_path(self):
+        adjacency = self.adjacency
+        costs = adjacency.costs
+        exits = adjacency.exits
+        g, rhs = self.g, self.rhs
+        start = self.start
+        expanded = []
+
+        while True:
+            start_key = self.calculate_key(start)
+            if not (self.top_key() < (start_key[0] + KEY_EPSILON, start_key[1]) or rhs[start] != g[start]):
+                break
+
+            key, node = self.queue[0]
+            new_key = self.calculate_key(node)
+
+            if key < new_key:
+                self.push(node, new_key)
+                continue
+
+            heapq.heappop(self.queue)
+            del self.queued[node]
+            expanded.append(node)
+
+            # Overconsistent: the node's distance has gone down, pass it on to its neighbours
+            if g[node] > rhs[node]:
+                g[node] = rhs[node]
+                for offset, step in adjacency.moves:
+                    neighbour = node + offset
+                    if neighbour != self.goal and costs[neighbour] != inf:
+                        distance = step * (costs[node] + exits[neighbour]) + g[node]
+                        if distance < rhs[neighbour]:
+                            if rhs[neighbour] == inf and g[neighbour] == inf:
+                                self.touched.append(neighbour)
+                            rhs[neighbour] = distance
+                            self.update_vertex_queue(neighbour)
+
+            # Underconsistent: the node's distance has gone up, so it and its
+            # neighbours need their lookahead recalculating
+            else:
+                g[node] = inf
+                self.update_vertex(node)
+                for offset in adjacency.offsets:
+                    self.update_vertex(node + offset)
+
+        return expanded
+
+    # Put a node whose rhs has just been lowered in the right place in the queue
+    def update_vertex_queue(self, node):
+        if self.g[node] != self.rhs[node]:
+            self.push(node, self.calculate_key(node))
+        else:
+            self.queued.pop(node, None)
+
+    # Follow the cheapest neighbours from the start to the goal
+    def extract_path(self):
+        adjacency = self.adjacency
+        costs = adjacency.costs
+        g = self.g
+        node = self.start
+
+        if g[node] == inf:
+            return []
+
+        path = [adjacency.cell(node)]
+        while node != self.goal and len(path) <= adjacency.size:
+            best, best_distance = None, inf
+            leave = adjacency.exits[node]
+            for offset, step in adjacency.moves:
+                neighbour = node + offset
+                distance = step * (costs[neighbour] + leave) + g[neighbour]
+                if distance < best_distance:
+                    best, best_distance = neighbour, distance
+            node = best
+            path.append(adjacency.cell(node))
+
+        return path
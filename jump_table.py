@@ -0,0 +1,211 @@
+'''
+Precomputed jump distances for jump point search (JPS+).
+
+Where a jump from a cell ends up only depends on the walls, not on the search,
+so instead of scanning along every jump during each search the grid works out
+once, for every cell and every direction, how far the jump goes:
+
+    distance > 0    the jump stops at a jump point that many cells away
+    distance <= 0   the jump runs into a wall after -distance open cells
+
+A search then only has to check whether its goal lies on the way (see
+jump_point_search in pathfinding.py). The table uses the same padded flat ids
+as the adjacency index and is worked out with a few vectorised passes. When
+cells are walled or opened one at a time (e.g. while a wall is being drawn)
+only the lines of cells whose jumps they can change are worked out again, and
+other changes, such as moving the start and end points, leave it alone.
+'''
+import numpy as np
+from array import array
+from math import inf
+from adjacency import STRAIGHT, DIAGONAL
+
+
+class JumpTable():
+    def __init__(self, adjacency):
+        self.adjacency = adjacency
+        # Jump distance of every flat id for each (dr, dc) direction. Kept as arrays of C ints, which
+        # index as quickly as lists but take a fraction of the memory on big open grids
+        self.distances = {}
+        # The same distances as NumPy arrays sharing the C ints' memory, for patching them
+        self.views = {}
+        # Which flat ids are open, and the (rows, columns) part of it that is the grid itself
+        self.open_ = None
+        self.walkable = None
+        self.version = None
+
+    # Bring the table up to date with the grid's (rows, columns) costs, given the cells changed
+    # since it was last updated, or None if that isn't known
+    def update(self, costs, changes):
+        if self.walkable is None or changes is None:
+            walkable = np.isfinite(costs)
+            if self.walkable is None or not np.array_equal(walkable, self.walkable):
+                self.rebuild(walkable)
+            return
+        flipped = []
+        for cell in set(changes):
+            open_ = bool(costs[cell] != inf)
+            if self.walkable[cell] != open_:
+                # Also updates open_, which walkable is a view of
+                self.walkable[cell] = open_
+                flipped.append(cell)
+        if flipped:
+            self.patch(flipped)
+
+    # Work out every jump distance from a (rows, columns) array saying which cells are open
+    def rebuild(self, walkable):
+        adjacency = self.adjacency
+        width = adjacency.width
+        padded = np.zeros((adjacency.rows + 2, width), dtype=bool)
+        padded[1:-1, 1:-1] = walkable
+        open_ = padded.ravel()
+
+        # open_ at id + offset for every id (what wraps round at the ends is padding, which is never open)
+        def at(offset):
+            return np.roll(open_, -offset)
+
+        distances = {}
+        if not adjacency.diagonals:
+            # Paths can only turn at jump points, so a vertical jump also stops wherever a sideways jump would find one
+            for dr, dc in STRAIGHT[2:]:
+                distances[dr, dc] = jump_distances(open_, straight_forced(at, width, False, dr, dc), dc)
+            sideways = (distances[0, 1] > 0) | (distances[0, -1] > 0)
+            for dr, dc in STRAIGHT[:2]:
+                distances[dr, dc] = jump_distances(open_, straight_forced(at, width, False, dr, dc) | sideways, dr * width)
+        else:
+            # A diagonal jump also stops wherever a straight jump along either of its directions would find one
+            for dr, dc in STRAIGHT:
+                distances[dr, dc] = jump_distances(open_, straight_forced(at, width, True, dr, dc), dr * width + dc)
+            for dr, dc in DIAGONAL:
+                forced = diagonal_forced(at, width, dr, dc) | (distances[0, dc] > 0) | (distances[dr, 0] > 0)
+                distances[dr, dc] = jump_distances(open_, forced, dr * width + dc)
+
+        self.open_ = open_
+        self.walkable = padded[1:-1, 1:-1]
+        self.distances = {direction: array('i', distance.astype(np.int32).tobytes()) for direction, distance in distances.items()}
+        self.views = {direction: np.frombuffer(distance, dtype=np.int32) for direction, distance in self.distances.items()}
+
+    # Work out again the jumps along every line that a change to the given (row, column) cells can
+    # affect: the rows and columns through and beside them, and then the lines through every cell where
+    # whether a straight jump finds a jump point has changed (as the vertical jumps without diagonals,
+    # and the diagonal jumps, stop there). The lines are gathered into one array, padding and all, so
+    # a jump along them is a step of one index. On open ground a single wall can make a jump point
+    # of every cell in the rows beside it, so if that means most of the grid, it is all rebuilt
+    def patch(self, cells):
+        adjacency = self.adjacency
+        width, height = adjacency.width, adjacency.rows + 2
+        open_, views = self.open_, self.views
+        cells = [(row + 1, column + 1) for row, column in cells]
+        rows = {row + d for row, column in cells for d in (-1, 0, 1) if 0 < row + d < height - 1}
+        columns = {column + d for row, column in cells for d in (-1, 0, 1) if 0 < column + d < width - 1}
+
+        # open_ at id + offset for every id in ids (ids off the ends are for the padding, whose jumps don't matter)
+        def along(ids):
+            return lambda offset: open_.take(ids + offset, mode='clip')
+
+        # Work out the jumps in direction (dr, dc) at ids, which run along lines in the direction
+        # of step, and return the ids where whether the jump finds a jump point has changed
+        def work_out(ids, dr, dc, forced, step):
+            before = views[dr, dc][ids] > 0
+            views[dr, dc][ids] = after = jump_distances(open_[ids], forced, step)
+            return ids[before != (after > 0)]
+
+        if not adjacency.diagonals:
+            ids = row_ids(rows, width)
+            changed = [work_out(ids, dr, dc, straight_forced(along(ids), width, False, dr, dc), dc) for dr, dc in STRAIGHT[2:]]
+            columns.update((np.concatenate(changed) % width).tolist())
+            if len(columns) * height > adjacency.size // 2:
+                self.rebuild(self.walkable)
+                return
+            ids = column_ids(columns, width, height)
+            sideways = (views[0, 1][ids] > 0) | (views[0, -1][ids] > 0)
+            for dr, dc in STRAIGHT[:2]:
+                work_out(ids, dr, dc, straight_forced(along(ids), width, False, dr, dc) | sideways, dr)
+        else:
+            # The cells themselves and the ones around them, next to which the walls have changed
+            changed = [np.array([row * width + column + dr * width + dc for row, column in cells for dr, dc in STRAIGHT + DIAGONAL + ((0, 0),)])]
+            ids = row_ids(rows, width)
+            changed += [work_out(ids, dr, dc, straight_forced(along(ids), width, True, dr, dc), dc) for dr, dc in STRAIGHT[2:]]
+            ids = column_ids(columns, width, height)
+            changed += [work_out(ids, dr, dc, straight_forced(along(ids), width, True, dr, dc), dr) for dr, dc in STRAIGHT[:2]]
+            changed_rows, changed_columns = np.divmod(np.concatenate(changed), width)
+            # Lines down and to the right (fixed row - column), and down and to the left (fixed row + column)
+            lines = {1: diagonal_ids(np.unique(changed_rows - changed_columns), width, height, 1),
+                     -1: diagonal_ids(np.unique(changed_rows + changed_columns), width, height, -1)}
+            if len(lines[1]) + len(lines[-1]) > adjacency.size:
+                self.rebuild(self.walkable)
+                return
+            for dr, dc in DIAGONAL:
+                ids = lines[dr * dc]
+                forced = diagonal_forced(along(ids), width, dr, dc) | (views[0, dc][ids] > 0) | (views[dr, 0][ids] > 0)
+                work_out(ids, dr, dc, forced, dr)
+
+# Which cells a straight jump in direction (dr, dc) stops at because of the walls around them, given
+# at(offset), the open_ array offset by that much. Without diagonals a cell is a jump point for a
+# horizontal jump if an open cell beside it has a wall behind it (so the path may need to turn there),
+# and likewise for a vertical jump. With diagonals it is one if a wall beside it hides a cell the
+# path may need to turn towards
+def straight_forced(at, width, diagonals, dr, dc):
+    offset = dr * width + dc
+    if not diagonals:
+        if dc:
+            return (at(-width) & ~at(-width - dc)) | (at(width) & ~at(width - dc))
+        return (at(-1) & ~at(-1 - offset)) | (at(1) & ~at(1 - offset))
+    if dc:
+        return (at(dc + width) & ~at(width)) | (at(dc - width) & ~at(-width))
+    return (at(offset + 1) & ~at(1)) | (at(offset - 1) & ~at(-1))
+
+# The same for a diagonal jump: a cell is a jump point if a wall beside it hides a cell the path may need to turn towards
+def diagonal_forced(at, width, dr, dc):
+    return (at(dr * width - dc) & ~at(-dc)) | (at(dc - dr * width) & ~at(-dr * width))
+
+# Flat ids of the given (padded) rows, one row after the other
+def row_ids(rows, width):
+    return (np.array(sorted(rows))[:, None] * width + np.arange(width)).ravel()
+
+# Flat ids of the given (padded) columns, one column after the other, each from top to bottom
+def column_ids(columns, width, height):
+    return (np.arange(height)[:, None] * width + np.array(sorted(columns))).T.ravel()
+
+# Flat ids of the diagonal lines through the padded grid with the given keys, one line after the
+# other, each from top to bottom: row - column = key for direction 1, row + column = key for -1
+def diagonal_ids(keys, width, height, direction):
+    lines = []
+    for key in keys.tolist():
+        if direction == 1:
+            rows = np.arange(max(0, key), min(height - 1, width - 1 + key) + 1)
+        else:
+            rows = np.arange(max(0, key - width + 1), min(height - 1, key) + 1)
+        lines.append(rows * width + direction * (rows - key))
+    return np.concatenate(lines)
+
+# For every flat id, how far a jump by offset goes before it reaches a forced (and open) cell, as a
+# positive distance, or runs into a wall, as minus the number of open cells passed over
+def jump_distances(open_, forced, offset):
+    stops = ~open_ | forced
+    steps = steps_to_next(stops, offset)
+    ends = np.arange(len(stops)) + steps * offset
+    # Jumps from the padding can run off the ends; they are never asked for
+    np.clip(ends, 0, len(stops) - 1, out=ends)
+    return np.where(open_[ends], steps, 1 - steps)
+
+# For every index i, the smallest k >= 1 with stops[i + k*offset] (or past the end of the array)
+def steps_to_next(stops, offset):
+    size = len(stops)
+    stride = abs(offset)
+    # Laid out in rows of stride indexes, each column holds every id a jump by offset passes through
+    chains = np.ones(-(-size // stride) * stride, dtype=bool)
+    chains[:size] = stops
+    chains = chains.reshape(-1, stride)
+    if offset < 0:
+        chains = chains[::-1]
+    rows = np.arange(len(chains), dtype=np.int32)[:, None]
+    # Row of the first stop at or after each row, then the first one strictly after it
+    first = np.where(chains, rows, len(chains))
+    first = np.minimum.accumulate(first[::-1], axis=0)[::-1]
+    after = np.full_like(first, len(chains))
+    after[:-1] = first[1:]
+    steps = after - rows
+    if offset < 0:
+        steps = steps[::-1]
+    return steps.ravel()[:size]
@@ -0,0 +1,176 @@
+'''
+Running batch searches and maze generation on every core.
+
+ParallelRunner starts a pool of worker processes. The grid to be searched is
+copied into shared memory once, when the runner is created, and every worker
+maps that same copy instead of having the grid pickled and sent with each task.
+The workers only read it, so the grid the runner was given can carry on being
+edited without affecting them (make a new runner to search the edited grid).
+
+    with ParallelRunner(grid) as runner:
+        results = runner.batch_paths(queries)
+        mazes = runner.generate('recursive_division', seeds=range(100), rows=95)
+
+Results always come back in the same order as the queries or seeds, and a
+maze generated from a seed is the same as one generated from that seed without
+the runner.
+
+Only the grid itself is shared. Each worker still builds its own search
+structures from it (the adjacency's Python lists and the search state), about
+WORKER_BYTES_PER_CELL bytes per cell: some 320MB per worker for a 2000x2000
+grid. So unless told how many processes to use, the runner starts no more
+workers than fit in half of the memory that is free.
+'''
+import os
+import random
+import numpy as np
+from multiprocessing import Pool, shared_memory
+from array_grid import ArrayGrid, TYPE_CODES, TYPE_COSTS
+from pathfinding import make_grid, batch_paths, prim, better_prim, recursive_division, eller, random_terrain, noise_terrain
+
+GENERATORS = ('prim', 'better_prim', 'recursive_division', 'eller', 'random_terrain', 'noise_terrain')
+
+# Each start's queries are kept together, in about this many tasks per worker
+TASKS_PER_PROCESS = 4
+
+# Roughly what a worker's own search structures take per cell of the grid, at their peak
+WORKER_BYTES_PER_CELL = 80
+
+
+class ParallelRunner():
+    def __init__(self, mazearray=None, processes=None):
+        self.memory = None
+        self.shape = None
+        self.has_exit_costs = False
+        if mazearray is not None:
+            types, costs, exit_costs = mazearray.types, mazearray.costs, mazearray.exit_costs
+            self.shape = types.shape
+            self.has_exit_costs = exit_costs is not None
+            size = types.nbytes + costs.nbytes * (2 if self.has_exit_costs else 1)
+            self.memory = shared_memory.SharedMemory(create=True, size=size)
+            shared_types, shared_costs, shared_exit_costs = shared_arrays(self.memory.buf, self.shape, self.has_exit_costs)
+            shared_types[:] = types
+            shared_costs[:] = costs
+            if self.has_exit_costs:
+                shared_exit_costs[:] = exit_costs
+
+        name = self.memory.name if self.memory is not None else None
+        self.processes = processes or default_processes(self.shape)
+        self.pool = Pool(self.processes, initializer=attach, initargs=(name, self.shape, self.has_exit_costs))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # Stop the workers and free the shared grid
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+        if self.memory is not None:
+            self.memory.close()
+            self.memory.unlink()
+            self.memory = None
+
+    # Same as pathfinding.batch_paths on the runner's grid, with the starts shared out between the workers
+    def batch_paths(self, queries, diagonals=False):
+        assert self.memory is not None, "ParallelRunner needs a grid to search"
+
+        queries_by_start = {}
+        for index, (start_point, goal_point) in enumerate(queries):
+            queries_by_start.setdefault(tuple(start_point), []).append((index, start_point, goal_point))
+
+        # Biggest groups first, each onto the task with the fewest queries so far
+        num_tasks = min(len(queries_by_start), self.processes * TASKS_PER_PROCESS)
+        tasks = [[] for task in range(num_tasks)]
+        for group in sorted(queries_by_start.values(), key=len, reverse=True):
+            min(tasks, key=len).extend(group)
+
+        results = [None] * len(queries)
+        task_results = self.pool.map(search, [([(start, goal) for index, start, goal in task], diagonals) for task in tasks])
+        for task, task_result in zip(tasks, task_results):
+            for (index, start, goal), result in zip(task, task_result):
+                results[index] = result
+        return results
+
+    # Generate one maze per seed with the named generator, returning a list of grids
+    # start_point and end_point are put on every maze, as the buttons in grid.py do
+    def generate(self, generator, seeds, rows, start_point=None, end_point=None):
+        assert generator in GENERATORS, f"generator must be one of: {GENERATORS}"
+        start_point = start_point or (0, 0)
+        end_point = end_point or (rows - 1, rows - 1)
+
+        mazes = []
+        for types in self.pool.map(generate, [(generator, seed, rows, start_point, end_point) for seed in seeds]):
+            mazes.append(ArrayGrid.from_arrays(types, TYPE_COSTS[types]))
+        return mazes
+
+
+# One worker per core, but no more than fit in half the free memory when searching a grid of the
+# given shape (if the platform can say how much memory is free)
+def default_processes(shape):
+    processes = os.cpu_count() or 1
+    if shape is None:
+        return processes
+    try:
+        free = os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (AttributeError, ValueError, OSError):
+        return processes
+    per_worker = shape[0] * shape[1] * WORKER_BYTES_PER_CELL
+    return max(1, min(processes, free // 2 // per_worker))
+
+# types, costs and (if the grid has them) exit costs arrays laid out one after the other in a shared buffer
+def shared_arrays(buffer, shape, has_exit_costs=False):
+    types = np.ndarray(shape, dtype=np.uint8, buffer=buffer)
+    costs = np.ndarray(shape, dtype=np.float32, buffer=buffer, offset=types.nbytes)
+    exit_costs = None
+    if has_exit_costs:
+        exit_costs = np.ndarray(shape, dtype=np.float32, buffer=buffer, offset=types.nbytes + costs.nbytes)
+    return types, costs, exit_costs
+
+
+### WORKER PROCESSES ###
+
+# The shared memory and the grid around it, set up once in each worker
+worker_memory = None
+worker_grid = None
+
+def attach(name, shape, has_exit_costs=False):
+    global worker_memory, worker_grid
+    if name is None:
+        return
+    worker_memory = shared_memory.SharedMemory(name=name)
+    types, costs, exit_costs = shared_arrays(worker_memory.buf, shape, has_exit_costs)
+    for array in (types, costs, exit_costs):
+        if array is not None:
+            array.flags.writeable = False
+    worker_grid = ArrayGrid.from_arrays(types, costs, exit_costs)
+
+def search(task):
+    queries, diagonals = task
+    return batch_paths(worker_grid, queries, diagonals=diagonals)
+
+def generate(task):
+    generator, seed, rows, start_point, end_point = task
+    random.seed(seed)
+
+    if generator == 'prim':
+        mazearray = prim(rows, start_point, end_point)
+    elif generator == 'better_prim':
+        mazearray = better_prim(rows, start_point, end_point)
+        mazearray.clear_visited()
+    else:
+        mazearray = make_grid(rows)
+        if generator == 'recursive_division':
+            recursive_division(mazearray)
+        elif generator == 'eller':
+            eller(mazearray)
+        elif generator == 'noise_terrain':
+            noise_terrain(mazearray)
+        else:
+            random_terrain(mazearray)
+        mazearray.types[start_point] = TYPE_CODES['start']
+        mazearray.types[end_point] = TYPE_CODES['end']
+
+    return mazearray.types
@@ -0,0 +1,1336 @@
+'''
+Display-free pathfinding and maze generation engine.
+
+Every function here works on a grid (an ArrayGrid, indexed as
+mazearray[row][column]) and never touches pygame, so it can be imported and
+run in batch jobs and tests without a window. Rendering is optional: pass an
+Observer and it is told about every cell that changes.
+'''
+import time
+import heapq
+import random
+import numpy as np
+from math import inf
+from collections import deque
+from array_grid import ArrayGrid, TYPE_CODES
+from priority_queue import AStarQueue, BucketQueue, BUCKET_QUEUE_MAX_COST
+from random_set import RandomSet
+from search_stats import SearchStats, RenderClock, NullRenderClock
+
+
+# Receives notifications as the engine changes cells. The base class ignores
+# them all, which is what the algorithms use when no observer is given.
+class Observer():
+
+    # A single cell has changed; animate=False means it doesn't need to be
+    # shown step by step (e.g. the traced back path)
+    def cell_changed(self, mazearray, row, column, animate=True):
+        pass
+
+    # A whole block of cells (rows by columns, both ranges) has changed at once,
+    # e.g. a wall filled in with one slice; by default passed on a cell at a time
+    def region_changed(self, mazearray, rows, columns):
+        for row in rows:
+            for column in columns:
+                self.cell_changed(mazearray, row, column)
+
+    # A run has finished and the whole grid may be shown
+    def refresh(self, mazearray):
+        pass
+
+
+NULL_OBSERVER = Observer()
+
+# Times a search's observer, if it has one (see search_stats.py)
+def render_clock(observer):
+    return NullRenderClock() if observer is NULL_OBSERVER else RenderClock()
+
+
+### UTILITY FUNCTIONS ###
+
+# Make a new (square) grid with every cell set to the same node type
+def make_grid(rows, nodetype='blank'):
+    return ArrayGrid(rows, nodetype)
+
+# + represents non-diagonal neighbours, x diagonal neighbours
+def get_neighbours(node, max_width, diagonals=False):
+    if not diagonals:
+        neighbours = (
+            ((min(max_width,node[0]+1),node[1]),"+"),
+            ((max(0,node[0]-1),node[1]),"+"),
+            ((node[0],min(max_width,node[1]+1)),"+"),
+            ((node[0],max(0,node[1]-1)),"+")
+        )
+    else:
+        neighbours = (
+            ((min(max_width,node[0]+1),node[1]),"+"),
+            ((max(0,node[0]-1),node[1]),"+"),
+            ((node[0],min(max_width,node[1]+1)),"+"),
+            ((node[0],max(0,node[1]-1)),"+"),
+            ((min(max_width,node[0]+1),min(max_width,node[1]+1)),"x"),
+            ((min(max_width,node[0]+1),max(0,node[1]-1)),"x"),
+            ((max(0,node[0]-1),min(max_width,node[1]+1)),"x"),
+            ((max(0,node[0]-1),max(0,node[1]-1)),"x")
+        )
+
+    return (neighbour for neighbour in neighbours if neighbour[0] != node)
+
+# Clear board, keeping excluded nodes
+def clear_visited(mazearray, observer=None):
+    observer = observer or NULL_OBSERVER
+    mazearray.clear_visited()
+    observer.refresh(mazearray)
+
+# Set every cell apart from the excluded points back to a blank node
+def reset_grid(mazearray, excluded=()):
+    mazearray.reset('blank', excluded=excluded)
+
+
+# The maze generators and searches below are each written as a generator (the
+# *_steps functions) that yields after every cell it changes, so they can be run
+# a few steps at a time (see scheduler.py). The plain functions use run_steps to
+# run them to the end and return their result
+def run_steps(steps):
+    result = []
+    def finish():
+        result.append((yield from steps))
+    deque(finish(), maxlen=0)
+    return result[0]
+
+# Whether there is any path between two cells, answered from the grid's connected components
+# (see components.py) without searching, e.g. to check that a generated maze can be solved
+def reachable(mazearray, start_point, goal_node, diagonals=False):
+    return mazearray.components(diagonals).connected(start_point, goal_node)
+
+# What following a path (of flat ids) costs, charging each move what the searches do
+def path_cost(adjacency, path):
+    steps = dict(adjacency.moves)
+    costs, exits = adjacency.costs, adjacency.exits
+    return sum(steps[node - previous] * (costs[node] + exits[previous]) for previous, node in zip(path, path[1:]))
+
+
+### MAZE CREATION ALGORITHMS ###
+
+# Type codes, for the generators that check cells' types straight from mazearray.types
+# (much quicker than mazearray[row][column].nodetype)
+BLANK = TYPE_CODES['blank']
+WALL = TYPE_CODES['wall']
+DORMANT = TYPE_CODES['dormant']
+
+# Scatter random patches of mud around the grid
+def random_terrain(mazearray, num_patches=False, observer=None):
+    return run_steps(random_terrain_steps(mazearray, num_patches, observer))
+
+# The steps of random_terrain, yielding after every cell it changes
+def random_terrain_steps(mazearray, num_patches=False, observer=None):
+    observer = observer or NULL_OBSERVER
+    rows = len(mazearray)
+
+    if not num_patches:
+        num_patches = random.randrange(int(rows/10),int(rows/4))
+
+    terrain_nodes = set([])
+
+    # For each patch we are creating we start with a centre node and branch outwards
+    # getting neighbours of neighbours etc. for each node that we consider, there is
+    # a variable probability of it becoming a patch of mud
+    # As we branch outwards that probability decreases
+    for patch in range(num_patches+1):
+        neighbour_cycles = 0
+        centre_point = (random.randrange(1,rows-1),random.randrange(1,rows-1))
+        patch_type = 'mud'
+        terrain_nodes.add(centre_point)
+
+        while len(terrain_nodes) > 0:
+            node = terrain_nodes.pop()
+
+            if mazearray[node[0]][node[1]].nodetype != 'start' and mazearray[node[0]][node[1]].nodetype != 'end':
+                mazearray[node[0]][node[1]].update(nodetype=patch_type)
+                observer.cell_changed(mazearray, node[0], node[1])
+                yield
+
+            neighbour_cycles += 1
+
+            for node, ntype in get_neighbours(node, rows-1):
+
+                if mazearray[node[0]][node[1]].nodetype == 'mud':
+                    continue
+                threshold = 700-(neighbour_cycles*10)
+
+                if random.randrange(1,101) <= threshold:
+                    terrain_nodes.add(node)
+
+    observer.refresh(mazearray)
+    return mazearray
+
+# Terrain types used by noise_terrain, from the lowest noise values to the
+# highest, with the share of the grid each one covers
+TERRAINS = (('water', 0.1), ('sand', 0.1), ('blank', 0.45), ('mud', 0.15), ('forest', 0.2))
+
+# Cover the whole grid in terrain in one go, from smooth random noise: neighbouring
+# cells get similar noise values, so each terrain type forms natural looking regions
+# scale is roughly the size (in cells) of the biggest features, and the same seed
+# always gives the same terrain. Start and end nodes are left where they are
+def noise_terrain(mazearray, terrains=TERRAINS, scale=16, octaves=4, seed=None, observer=None):
+    observer = observer or NULL_OBSERVER
+    rows, columns = mazearray.shape
+
+    # Without a seed, take one from the random module so random.seed() still makes it repeatable
+    if seed is None:
+        seed = random.getrandbits(32)
+    noise = value_noise(rows, columns, scale, octaves, np.random.default_rng(seed))
+
+    # Split the noise values at the points that give each terrain its share of the grid
+    shares = np.cumsum([share for nodetype, share in terrains])
+    thresholds = np.quantile(noise, shares[:-1] / shares[-1])
+    codes = np.array([TYPE_CODES[nodetype] for nodetype, share in terrains], dtype=np.uint8)
+    types = codes[np.searchsorted(thresholds, noise)]
+
+    kept = (mazearray.types == TYPE_CODES['start']) | (mazearray.types == TYPE_CODES['end'])
+    types[kept] = mazearray.types[kept]
+    mazearray.set_types(types)
+
+    observer.refresh(mazearray)
+    return mazearray
+
+# Value noise: random values on a coarse lattice, smoothly interpolated between
+# Several octaves are added together, each with a lattice twice as fine and half the weight of the last
+# Returns a (rows, columns) float32 array of values between 0 and 1
+def value_noise(rows, columns, scale=16, octaves=4, rng=None):
+    rng = rng or np.random.default_rng()
+    noise = np.zeros((rows, columns), dtype=np.float32)
+    weight = 1
+    total_weight = 0
+
+    for octave in range(octaves):
+        size = max(scale / 2**octave, 1)
+        lattice = rng.random((int(rows / size) + 2, int(columns / size) + 2), dtype=np.float32)
+
+        # Where each cell falls between the lattice points, eased so the joins are smooth
+        y = np.arange(rows, dtype=np.float32) / size
+        x = np.arange(columns, dtype=np.float32) / size
+        y0 = y.astype(np.intp)
+        x0 = x.astype(np.intp)
+        ty = (y - y0)[:, np.newaxis]
+        tx = (x - x0)[np.newaxis, :]
+        ty = ty * ty * (3 - 2 * ty)
+        tx = tx * tx * (3 - 2 * tx)
+
+        above, below = lattice[y0], lattice[y0 + 1]
+        top = above[:, x0] * (1 - tx) + above[:, x0 + 1] * tx
+        bottom = below[:, x0] * (1 - tx) + below[:, x0 + 1] * tx
+        noise += weight * (top * (1 - ty) + bottom * ty)
+
+        total_weight += weight
+        weight /= 2
+
+    return noise / total_weight
+
+# randomized Prim's algorithm for creating random mazes
+# start_node and end_node are put back on the finished maze
+def prim(rows, start_node, end_node, mazearray=False, start_point=False, observer=None, seed=None):
+    return run_steps(prim_steps(rows, start_node, end_node, mazearray, start_point, observer, seed))
+
+# The steps of prim, yielding after every cell it changes
+def prim_steps(rows, start_node, end_node, mazearray=False, start_point=False, observer=None, seed=None):
+    observer = observer or NULL_OBSERVER
+    # Passing a seed makes the maze the same every time
+    rng = random.Random(seed) if seed is not None else random
+
+    # If a maze isn't input, we just create a grid full of walls
+    if not mazearray:
+        mazearray = make_grid(rows, 'wall')
+        observer.refresh(mazearray)
+
+    n = len(mazearray) - 1
+    types = mazearray.types
+
+    if not start_point:
+        start_point = (rng.randrange(0,n,2),rng.randrange(0,n,2))
+
+    observer.cell_changed(mazearray, start_point[0], start_point[1])
+    yield
+
+    # The walls are kept in a RandomSet so a random one can be picked without copying them all
+    walls = RandomSet(rng=rng)
+
+    neighbours = get_neighbours(start_point, n)
+
+    for neighbour, ntype in neighbours:
+        if types[neighbour] == WALL:
+            walls.add(neighbour)
+
+    # While there are walls in the list:
+    # Pick a random wall from the list. If only one of the cells that the wall divides is visited, then:
+    # # Make the wall a passage and mark the unvisited cell as part of the maze.
+    # # Add the neighboring walls of the cell to the wall list.
+    # Remove the wall from the list.
+    while len(walls) > 0:
+        wall = walls.choice()
+        wall_neighbours = get_neighbours(wall, n)
+        neighbouring_walls = set()
+        pcount = 0
+        for wall_neighbour, ntype in wall_neighbours:
+            if wall_neighbour == start_point:
+                continue
+            if types[wall_neighbour] != WALL:
+                pcount += 1
+            else:
+                neighbouring_walls.add(wall_neighbour)
+
+        if pcount <= 1:
+            mazearray[wall[0]][wall[1]].update(nodetype='blank')
+            observer.cell_changed(mazearray, wall[0], wall[1])
+            yield
+
+            walls.update(neighbouring_walls)
+
+        walls.remove(wall)
+
+    mazearray[end_node[0]][end_node[1]].update(nodetype='end')
+    mazearray[start_node[0]][start_node[1]].update(nodetype='start')
+
+    return mazearray
+
+# randomized Prim's algorithm for creating random mazes
+# This version maintains the traditional "maze" look, where a route cannot
+# be diagonally connected to another point on the route
+def better_prim(rows, start_node, end_node, mazearray=False, start_point=False, observer=None, seed=None):
+    return run_steps(better_prim_steps(rows, start_node, end_node, mazearray, start_point, observer, seed))
+
+# The steps of better_prim, yielding after every cell it changes
+def better_prim_steps(rows, start_node, end_node, mazearray=False, start_point=False, observer=None, seed=None):
+    observer = observer or NULL_OBSERVER
+    # Passing a seed makes the maze the same every time
+    rng = random.Random(seed) if seed is not None else random
+
+    # If a maze isn't input, we just create a grid full of walls
+    if not mazearray:
+        mazearray = make_grid(rows, 'wall')
+        mazearray.fill('dormant', (slice(1, None, 2), slice(1, None, 2)))
+        observer.refresh(mazearray)
+
+    n = len(mazearray) - 1
+    types = mazearray.types
+
+    if not start_point:
+        start_point = (rng.randrange(1,n,2),rng.randrange(1,n,2))
+        mazearray[start_point[0]][start_point[1]].update(nodetype='blank')
+
+    observer.cell_changed(mazearray, start_point[0], start_point[1])
+    yield
+
+    # The walls are kept in a RandomSet so a random one can be picked without copying them all
+    walls = RandomSet(rng=rng)
+
+    starting_walls = get_neighbours(start_point, n)
+
+    for wall, ntype in starting_walls:
+        if types[wall] == WALL:
+            walls.add(wall)
+
+    # While there are walls in the list (set):
+    # Pick a random wall from the list. If only one of the cells that the wall divides is visited, then:
+    # # Make the wall a passage and mark the unvisited cell as part of the maze.
+    # # Add the neighboring walls of the cell to the wall list.
+    # Remove the wall from the list.
+    while len(walls) > 0:
+        wall = walls.choice()
+        visited = 0
+        add_to_maze = []
+
+        for wall_neighbour, ntype in get_neighbours(wall,n):
+            if types[wall_neighbour] == BLANK:
+                visited += 1
+
+        if visited <= 1:
+            mazearray[wall[0]][wall[1]].update(nodetype='blank')
+            observer.cell_changed(mazearray, wall[0], wall[1])
+            yield
+
+            # A 'dormant' node (below) is a different type of node I had to create for this algo
+            # otherwise the maze generated doesn't look like a traditional maze.
+            # Every dormant eventually becomes a blank node, while the regular walls
+            # sometimes become a passage between blanks and are sometimes left as walls
+            for neighbour, ntype in get_neighbours(wall,n):
+                if types[neighbour] == DORMANT:
+                    add_to_maze.append((neighbour[0],neighbour[1]))
+
+            if len(add_to_maze) > 0:
+                cell = add_to_maze.pop()
+                mazearray[cell[0]][cell[1]].update(nodetype='blank')
+                observer.cell_changed(mazearray, cell[0], cell[1])
+                yield
+
+                for cell_neighbour, ntype in get_neighbours(cell,n):
+                    if types[cell_neighbour] == WALL:
+                        walls.add(cell_neighbour)
+
+        walls.remove(wall)
+
+    mazearray[end_node[0]][end_node[1]].update(nodetype='end')
+    mazearray[start_node[0]][start_node[1]].update(nodetype='start')
+
+    return mazearray
+
+# This is for use in the recursive division function
+# Walls are only ever put on these rows/columns, and gaps are never left on them,
+# to avoid creating a gap where there will ultimately be an intersection of
+# perpendicular walls, creating an unsolveable maze
+def get_gaps_to_offset(rows):
+    return [x for x in range(2, rows, 3)]
+
+# Where to divide a chamber along one side (running from start for length cells):
+# the wall line nearest the middle (or a random point if not halving) that leaves
+# cells either side of it, or None if the chamber can't be divided that way
+def division_line(start, length, lines, halving=True):
+    middle = start + length // 2 if halving else random.randrange(start, start + length)
+    for distance in range(length):
+        for line in (middle - distance, middle + distance):
+            if start < line < start + length - 1 and line in lines:
+                return line
+    return None
+
+# Recursive division algorithm
+# The chambers still to be divided are kept in a queue rather than on the call stack,
+# so big grids don't run into the recursion limit. order='depth' divides each chamber's
+# sub-chambers before moving on (the same maze as dividing them recursively) and
+# order='breadth' divides every chamber of one size before any of the smaller ones
+def recursive_division(mazearray, chamber=None, observer=None, gaps_to_offset=None, halving=True, order='depth'):
+    return run_steps(recursive_division_steps(mazearray, chamber, observer, gaps_to_offset, halving, order))
+
+# The steps of recursive_division, yielding after every chamber it divides
+def recursive_division_steps(mazearray, chamber=None, observer=None, gaps_to_offset=None, halving=True, order='depth'):
+    assert order in ('depth', 'breadth'), "order must be 'depth' or 'breadth'"
+    observer = observer or NULL_OBSERVER
+    rows, columns = mazearray.shape
+
+    if gaps_to_offset is None:
+        gaps_to_offset = get_gaps_to_offset(max(rows, columns))
+    gaps_to_offset = set(gaps_to_offset)
+
+    # When no "chamber" is input,we are starting with the base grid
+    # Chambers are (left, top, width, height), with left and width going down
+    # the rows and top and height going along the columns
+    if chamber == None:
+        chamber = (0, 0, rows, columns)
+    chambers = deque([chamber])
+
+    while chambers:
+        if order == 'depth':
+            chamber_left, chamber_top, chamber_width, chamber_height = chambers.pop()
+        else:
+            chamber_left, chamber_top, chamber_width, chamber_height = chambers.popleft()
+
+        x_wall = division_line(chamber_left, chamber_width, gaps_to_offset, halving)
+        y_wall = division_line(chamber_top, chamber_height, gaps_to_offset, halving)
+
+        # Base case: stop dividing
+        if x_wall is None and y_wall is None:
+            continue
+
+        # Each wall is filled in with one slice of the grid's arrays
+        if x_wall is not None:
+            # draw x wall
+            wall_columns = range(chamber_top, chamber_top + chamber_height)
+            mazearray.fill('wall', (x_wall, slice(wall_columns.start, wall_columns.stop)))
+            observer.region_changed(mazearray, range(x_wall, x_wall + 1), wall_columns)
+
+        if y_wall is not None:
+            # draw y wall
+            wall_rows = range(chamber_left, chamber_left + chamber_width)
+            mazearray.fill('wall', (slice(wall_rows.start, wall_rows.stop), y_wall))
+            observer.region_changed(mazearray, wall_rows, range(y_wall, y_wall + 1))
+
+        # A chamber that can only be divided one way is split in two by a single
+        # wall, with a gap anywhere along it
+        if x_wall is None or y_wall is None:
+            if x_wall is not None:
+                gaps = [(x_wall, random.randrange(chamber_top, chamber_top + chamber_height))]
+                new_chambers = ((chamber_left,  chamber_top,    x_wall - chamber_left,                      chamber_height),
+                                (x_wall + 1,    chamber_top,    chamber_left + chamber_width - x_wall - 1,  chamber_height))
+            else:
+                gaps = [(random.randrange(chamber_left, chamber_left + chamber_width), y_wall)]
+                new_chambers = ((chamber_left,  chamber_top,    chamber_width,  y_wall - chamber_top),
+                                (chamber_left,  y_wall + 1,     chamber_width,  chamber_top + chamber_height - y_wall - 1))
+
+        else:
+            x_divide = x_wall - chamber_left
+            y_divide = y_wall - chamber_top
+
+            # define the 4 new chambers (left, top, width, height)
+
+            top_left =      (chamber_left,                  chamber_top,                x_divide,                       y_divide)
+            top_right =     (chamber_left + x_divide + 1,   chamber_top,                chamber_width - x_divide - 1,   y_divide)
+            bottom_left =   (chamber_left,                  chamber_top + y_divide + 1, x_divide,                       chamber_height - y_divide - 1)
+            bottom_right =  (chamber_left + x_divide + 1,   chamber_top + y_divide + 1, chamber_width - x_divide - 1,   chamber_height - y_divide - 1)
+
+            new_chambers = (top_left, top_right, bottom_left, bottom_right)
+
+            # define the 4 walls (of a + symbol) (left, top, width, height)
+
+            left =      (chamber_left,                     chamber_top + y_divide,      x_divide,                       1)
+            right =     (chamber_left + x_divide + 1,      chamber_top + y_divide,      chamber_width - x_divide - 1,   1)
+            top =       (chamber_left + x_divide,          chamber_top,                 1,                              y_divide)
+            bottom =    (chamber_left + x_divide,          chamber_top + y_divide + 1,  1,                              chamber_height - y_divide - 1)
+
+            walls = (left, right, top, bottom)
+
+            gaps = []
+            for wall in random.sample(walls, 3):
+                if wall[3] == 1:
+                    x = random.randrange(wall[0],wall[0]+wall[2])
+                    y = wall[1]
+                    if x in gaps_to_offset and y in gaps_to_offset:
+                        if wall[2] == x_divide:
+                            x -= 1
+                        else:
+                            x += 1
+                    if x >= rows:
+                        x = rows -1
+                else: # the wall is horizontal
+                    x = wall[0]
+                    y = random.randrange(wall[1],wall[1]+wall[3])
+                    if y in gaps_to_offset and x in gaps_to_offset:
+                        if wall[3] == y_divide:
+                            y -=1
+                        else:
+                            y += 1
+                    if y >= columns:
+                        y = columns-1
+                gaps.append((x, y))
+
+        for x, y in gaps:
+            mazearray[x][y].update(nodetype="blank")
+            observer.cell_changed(mazearray, x, y)
+
+        yield
+
+        # Queue up the new chambers, so that going depth first takes the top left one next
+        chambers.extend(reversed(new_chambers) if order == 'depth' else new_chambers)
+
+    return mazearray
+
+
+# Eller's algorithm, which builds a maze one row of cells at a time, only
+# remembering which set (of cells already joined up) each cell in the current row is in
+# Fills the whole of mazearray, with cells at odd rows and columns and walls between them
+def eller(mazearray, observer=None, seed=None):
+    return run_steps(eller_steps(mazearray, observer, seed))
+
+# The steps of eller, yielding after every row it fills in
+def eller_steps(mazearray, observer=None, seed=None):
+    observer = observer or NULL_OBSERVER
+    rows, columns = mazearray.shape
+
+    for top, band in eller_bands(rows, columns, band_rows=1, seed=seed):
+        mazearray.set_types(band, slice(top, top + len(band)))
+        for column in range(columns):
+            observer.cell_changed(mazearray, top, column)
+        yield
+
+    observer.refresh(mazearray)
+    return mazearray
+
+# The rows of an Eller's algorithm maze without a grid to put them in, as (top row, band)
+# pairs where band is a uint8 array of type codes at most band_rows tall
+# Only one band is held at a time, so mazes too big for memory can be written out as they are made
+def eller_bands(rows, columns=None, band_rows=64, seed=None):
+    columns = rows if columns is None else columns
+    band = []
+    top = 0
+    for line in eller_lines(rows, columns, seed):
+        band.append(line)
+        if len(band) == band_rows:
+            yield top, np.frombuffer(bytearray(b''.join(band)), dtype=np.uint8).reshape(len(band), columns)
+            top += len(band)
+            band = []
+    if band:
+        yield top, np.frombuffer(bytearray(b''.join(band)), dtype=np.uint8).reshape(len(band), columns)
+
+# Each row of an Eller's algorithm maze in turn, as a bytearray of type codes
+def eller_lines(rows, columns, seed=None):
+    rng = random.Random(seed) if seed is not None else random
+    cell_rows = (rows - 1) // 2
+    cell_columns = (columns - 1) // 2
+
+    # The set each cell in the current row is in
+    sets = list(range(cell_columns))
+    next_set = cell_columns
+
+    yield bytearray([WALL]) * columns
+
+    for cell_row in range(cell_rows):
+        last_row = cell_row == cell_rows - 1
+
+        line = bytearray([WALL]) * columns
+        line[1:2 * cell_columns:2] = bytearray([BLANK]) * cell_columns
+        members = {}
+        for position, cell_set in enumerate(sets):
+            members.setdefault(cell_set, []).append(position)
+
+        # Randomly join neighbouring cells that aren't in the same set yet (on the
+        # last row, join all of them so that the whole maze is connected)
+        for position in range(cell_columns - 1):
+            a, b = sets[position], sets[position + 1]
+            if a != b and (last_row or rng.random() < 0.5):
+                line[2 * position + 2] = BLANK
+                if len(members[a]) < len(members[b]):
+                    a, b = b, a
+                for member in members[b]:
+                    sets[member] = a
+                members[a] += members.pop(b)
+        yield line
+
+        if last_row:
+            break
+
+        # Every set carries on into the next row through at least one of its
+        # cells, and the cells below the others start sets of their own
+        line = bytearray([WALL]) * columns
+        next_sets = [None] * cell_columns
+        for cell_set, positions in members.items():
+            down = [position for position in positions if rng.random() < 0.5] or [rng.choice(positions)]
+            for position in down:
+                line[2 * position + 1] = BLANK
+                next_sets[position] = cell_set
+        for position in range(cell_columns):
+            if next_sets[position] is None:
+                next_sets[position] = next_set
+                next_set += 1
+        sets = next_sets
+        yield line
+
+    # Walls on the rows below the last row of cells
+    for row in range(max(2 * cell_rows, 1), rows):
+        yield bytearray([WALL]) * columns
+
+### PATHFINDING ALGORITHMS ###
+
+# Each search returns a SearchStats (see search_stats.py), which is true if it found a path.
+# Besides the observer, they take optional callbacks for profilers and the like:
+# on_expand(row, column) for every node expanded, on_push(row, column) for every node
+# put on the frontier, and on_path(path) with the path found, as (row, column) cells
+
+# Dijkstra's pathfinding algorithm, with the option to switch to A* by adding a heuristic of expected distance to end node
+# Nodes are handled as flat ids from the grid's adjacency index (see adjacency.py)
+def dijkstra(mazearray, start_point=(0,0), goal_node=False, diagonals=False, astar=False, observer=None, **callbacks):
+    return run_steps(dijkstra_steps(mazearray, start_point, goal_node, diagonals, astar, observer, **callbacks))
+
+# The steps of dijkstra, yielding after every cell it changes
+def dijkstra_steps(mazearray, start_point=(0,0), goal_node=False, diagonals=False, astar=False, observer=None,
+                   on_expand=None, on_push=None, on_path=None):
+    started = time.perf_counter()
+    stats = SearchStats()
+    times = stats.times
+    observer = observer or NULL_OBSERVER
+    # Time spent in the observer is only measured when there is one, so headless searches don't pay for it
+    clock = render_clock(observer)
+    # Cells are marked visited by stamping them with the grid's current epoch
+    visited_stamps, epoch = mazearray.visited_stamps, mazearray.epoch
+
+    # Get the dimensions of the (square) maze
+    n = len(mazearray) - 1
+
+    # If a goal_node is not set, put it in the bottom right (1 square away from either edge)
+    if not goal_node:
+        goal_node = (n,n)
+
+    adjacency = mazearray.adjacency(diagonals)
+    costs = adjacency.costs
+    exits = adjacency.exits
+    moves = adjacency.moves
+    width = adjacency.width
+    start_id = adjacency.index(*start_point)
+    goal_id = adjacency.index(*goal_node)
+    # Start and goal in different components (see components.py): there is no path, so don't search for one
+    if mazearray.components(diagonals).separated(start_point, goal_node):
+        times['init'] = time.perf_counter() - started
+        return stats
+    goal_row, goal_column = divmod(goal_id, width)
+    # Scales the heuristic so it never overestimates, whatever the cells cost
+    scale = adjacency.heuristic_scale
+
+    # Best known distance to each node, in flat arrays reused between runs
+    state = adjacency.search_state()
+    g = state.g
+    parent = state.parent
+    touched = state.touched
+
+    # With whole number costs and no diagonal (sqrt(2)) moves every priority is a
+    # whole number too, so while moves are cheap enough a bucket queue can replace the binary heap
+    if adjacency.integral and not diagonals and adjacency.max_move_cost <= BUCKET_QUEUE_MAX_COST:
+        queue = BucketQueue()
+    else:
+        queue = AStarQueue()
+    heap = queue.show()
+
+    g[start_id] = 0
+    touched.append(start_id)
+    queue.push(0, 0, start_id)
+    expanded, pushed, stale_pops, max_frontier = 0, 1, 0, 0
+    if on_push is not None:
+        on_push(*start_point)
+
+    search_started = time.perf_counter()
+    times['init'] = search_started - started
+
+    # Main algorithm loop
+    while heap:
+        # Everything pushed and not yet popped is still on the frontier
+        if pushed - expanded - stale_pops > max_frontier:
+            max_frontier = pushed - expanded - stale_pops
+        priority, current_distance, current_node = queue.pop()
+
+        # A shorter route to this node was found after this entry was pushed
+        if current_distance > g[current_node]:
+            stale_pops += 1
+            continue
+
+        expanded += 1
+        if on_expand is not None:
+            on_expand(*adjacency.cell(current_node))
+
+        if current_node == goal_id:
+            stats.found = True
+            break
+
+        # Check the neighbours of the current node, only pushing those we have
+        # found a shorter route to (so dominated entries never reach the heap)
+        leave = exits[current_node]
+        for offset, step in moves:
+            neighbour = current_node + offset
+            modifier = costs[neighbour]
+            if modifier == inf:
+                continue
+
+            neighbour_distance = current_distance + step*(modifier + leave)
+            if neighbour_distance < g[neighbour]:
+                if g[neighbour] == inf:
+                    touched.append(neighbour)
+                g[neighbour] = neighbour_distance
+                parent[neighbour] = current_node
+
+                heuristic = 0
+                if astar:
+                    row, column = divmod(neighbour, width)
+                    dr, dc = abs(goal_row - row), abs(goal_column - column)
+                    # Manhattan distance, or octile distance when diagonal moves are allowed
+                    heuristic = scale * (dr + dc if not diagonals else dr + dc + (2**0.5 - 2) * min(dr, dc))
+
+                queue.push(neighbour_distance+heuristic, neighbour_distance, neighbour)
+                pushed += 1
+                if on_push is not None:
+                    on_push(*adjacency.cell(neighbour))
+
+        # Mark visited nodes (shown as green)
+        if current_node != start_id:
+            row, column = adjacency.cell(current_node)
+            visited_stamps[row, column] = epoch
+            clock.pause()
+            observer.cell_changed(mazearray, row, column)
+            yield
+            clock.resume()
+
+    searched = time.perf_counter()
+    clock.split(times, search_started, searched)
+    stats.expanded, stats.pushed, stats.stale_pops, stats.max_frontier = expanded, pushed, stale_pops, max_frontier
+
+    # If the queue ran out before reaching the goal there is no path
+    if not stats.found:
+        return stats
+
+    # Draw the path back from goal node to start node
+    stats.path, stats.path_cost = trace_back(goal_id, start_id, parent, g, adjacency, mazearray, observer=observer)
+    times['traceback'] = time.perf_counter() - searched
+
+    if on_path is not None:
+        on_path(stats.path)
+    return stats
+
+# (DIJKSTRA/A*) trace a path back from the end node to the start node after the algorithm has been run,
+# following the parent pointers recorded during the search
+# Returns the path (as (row, column) cells from start to end) and its exact distance
+def trace_back(goal_node, start_node, parent, g, adjacency, mazearray, observer=None):
+    observer = observer or NULL_OBSERVER
+
+    # begin the list of nodes which will represent the path back, starting with the end node
+    path = [adjacency.cell(goal_node)]
+
+    current_node = goal_node
+
+    # Set the loop in motion until we get back to the start
+    while current_node != start_node:
+        current_node = parent[current_node]
+        row, column = adjacency.cell(current_node)
+        mazearray.path_stamps[row, column] = mazearray.epoch
+        observer.cell_changed(mazearray, row, column, animate=False)
+        path.append((row, column))
+
+    observer.refresh(mazearray)
+
+    path.reverse()
+    return path, g[goal_node]
+
+
+# Bidirectional Dijkstra/A*: grows one search forwards from the start and one backwards from the end,
+# and stops once no path through the two frontiers can be shorter than the best meeting point found
+# With astar=True both searches use the average of the forward and backward heuristics, which keeps
+# them consistent with each other so the same stopping rule still gives the shortest path
+def bidirectional(mazearray, start_point, goal_node, diagonals=False, astar=False, observer=None, **callbacks):
+    return run_steps(bidirectional_steps(mazearray, start_point, goal_node, diagonals, astar, observer, **callbacks))
+
+# The steps of bidirectional, yielding after every cell it changes
+def bidirectional_steps(mazearray, start_point, goal_node, diagonals=False, astar=False, observer=None,
+                        on_expand=None, on_push=None, on_path=None):
+    started = time.perf_counter()
+    stats = SearchStats()
+    times = stats.times
+    observer = observer or NULL_OBSERVER
+    clock = render_clock(observer)
+    visited_stamps, epoch = mazearray.visited_stamps, mazearray.epoch
+
+    adjacency = mazearray.adjacency(diagonals)
+    costs = adjacency.costs
+    exits = adjacency.exits
+    moves = adjacency.moves
+    width = adjacency.width
+    scale = adjacency.heuristic_scale
+    start_id = adjacency.index(*start_point)
+    goal_id = adjacency.index(*goal_node)
+    # Start and goal in different components: no path
+    if mazearray.components(diagonals).separated(start_point, goal_node):
+        times['init'] = time.perf_counter() - started
+        return stats
+    start_row, start_column = divmod(start_id, width)
+    goal_row, goal_column = divmod(goal_id, width)
+
+    # (estimate to the end - estimate from the start) / 2; forward keys add it, backward keys subtract it
+    def potential(node):
+        if not astar:
+            return 0
+        row, column = divmod(node, width)
+        to_goal = distance_estimate(abs(goal_row - row), abs(goal_column - column), diagonals)
+        from_start = distance_estimate(abs(start_row - row), abs(start_column - column), diagonals)
+        return scale * (to_goal - from_start) / 2
+
+    forward = adjacency.search_state('forward')
+    backward = adjacency.search_state('backward')
+    forward_queue = AStarQueue()
+    backward_queue = AStarQueue()
+    forward_heap = forward_queue.show()
+    backward_heap = backward_queue.show()
+
+    forward.g[start_id] = 0
+    forward.touched.append(start_id)
+    forward_queue.push(potential(start_id), 0, start_id)
+    backward.g[goal_id] = 0
+    backward.touched.append(goal_id)
+    backward_queue.push(-potential(goal_id), 0, goal_id)
+
+    # Length of the shortest path found so far, and the node where its two halves meet
+    best_distance = inf
+    meeting_node = None
+    if start_id == goal_id:
+        best_distance = 0
+        meeting_node = start_id
+    expanded, pushed, stale_pops, max_frontier = 0, 2, 0, 0
+    if on_push is not None:
+        on_push(*start_point)
+        on_push(*goal_node)
+
+    search_started = time.perf_counter()
+    times['init'] = search_started - started
+
+    # Main algorithm loop
+    while forward_heap and backward_heap:
+        if forward_heap[0][0] + backward_heap[0][0] >= best_distance:
+            break
+        if len(forward_heap) + len(backward_heap) > max_frontier:
+            max_frontier = len(forward_heap) + len(backward_heap)
+
+        # Expand whichever side has the smaller key
+        forwards = forward_heap[0][0] <= backward_heap[0][0]
+        if forwards:
+            queue, state, other, sign = forward_queue, forward, backward, 1
+        else:
+            queue, state, other, sign = backward_queue, backward, forward, -1
+        g, parent, touched, other_g = state.g, state.parent, state.touched, other.g
+
+        priority, current_distance, current_node = queue.pop()
+
+        # A shorter route to this node was found after this entry was pushed
+        if current_distance > g[current_node]:
+            stale_pops += 1
+            continue
+
+        expanded += 1
+        if on_expand is not None:
+            on_expand(*adjacency.cell(current_node))
+
+        for offset, step in moves:
+            neighbour = current_node + offset
+            if costs[neighbour] == inf:
+                continue
+
+            # Moving forwards costs the modifier of the node moved onto (plus the exit
+            # cost of the one left), which going backwards swap over
+            if forwards:
+                neighbour_distance = current_distance + step*(costs[neighbour] + exits[current_node])
+            else:
+                neighbour_distance = current_distance + step*(costs[current_node] + exits[neighbour])
+
+            if neighbour_distance < g[neighbour]:
+                if g[neighbour] == inf:
+                    touched.append(neighbour)
+                g[neighbour] = neighbour_distance
+                parent[neighbour] = current_node
+                queue.push(neighbour_distance + sign*potential(neighbour), neighbour_distance, neighbour)
+                pushed += 1
+                if on_push is not None:
+                    on_push(*adjacency.cell(neighbour))
+
+                # The other search has already reached this node, so there is a path through it
+                if neighbour_distance + other_g[neighbour] < best_distance:
+                    best_distance = neighbour_distance + other_g[neighbour]
+                    meeting_node = neighbour
+
+        # Mark visited nodes (shown as green)
+        if current_node != start_id and current_node != goal_id:
+            row, column = adjacency.cell(current_node)
+            visited_stamps[row, column] = epoch
+            clock.pause()
+            observer.cell_changed(mazearray, row, column)
+            yield
+            clock.resume()
+
+    searched = time.perf_counter()
+    clock.split(times, search_started, searched)
+    stats.expanded, stats.pushed, stats.stale_pops, stats.max_frontier = expanded, pushed, stale_pops, max_frontier
+
+    if meeting_node is None:
+        return stats
+
+    # Join the two halves of the path at the meeting node
+    path = []
+    node = meeting_node
+    while node is not None:
+        path.append(node)
+        node = forward.parent[node] if node != start_id else None
+    path.reverse()
+    node = meeting_node
+    while node != goal_id:
+        node = backward.parent[node]
+        path.append(node)
+
+    stats.path = [adjacency.cell(node) for node in path]
+    for row, column in stats.path:
+        mazearray.path_stamps[row, column] = epoch
+        observer.cell_changed(mazearray, row, column, animate=False)
+    observer.refresh(mazearray)
+
+    stats.found = True
+    stats.path_cost = best_distance
+    times['traceback'] = time.perf_counter() - searched
+
+    if on_path is not None:
+        on_path(stats.path)
+    return stats
+
+# Jump point search: A* that skips over the many equivalent paths through open areas by only stopping
+# ("jumping") at cells where a wall forces the path to turn, which are the only ones worth expanding
+# It relies on every move costing the same, so on grids with mud it falls back to A*
+def jump_point_search(mazearray, start_point, goal_node, diagonals=False, observer=None, **callbacks):
+    return run_steps(jump_point_search_steps(mazearray, start_point, goal_node, diagonals, observer, **callbacks))
+
+# The steps of jump_point_search, yielding after every cell it changes
+# Only jump points count as expanded and pushed nodes
+def jump_point_search_steps(mazearray, start_point, goal_node, diagonals=False, observer=None,
+                            on_expand=None, on_push=None, on_path=None):
+    if not mazearray.has_uniform_costs():
+        return (yield from dijkstra_steps(mazearray, start_point, goal_node, diagonals=diagonals, astar=True, observer=observer,
+                                          on_expand=on_expand, on_push=on_push, on_path=on_path))
+
+    started = time.perf_counter()
+    stats = SearchStats()
+    times = stats.times
+    observer = observer or NULL_OBSERVER
+    clock = render_clock(observer)
+    visited_stamps, epoch = mazearray.visited_stamps, mazearray.epoch
+
+    adjacency = mazearray.adjacency(diagonals)
+    costs = adjacency.costs
+    width = adjacency.width
+    start_id = adjacency.index(*start_point)
+    goal_id = adjacency.index(*goal_node)
+    # Start and goal in different components: no path
+    if mazearray.components(diagonals).separated(start_point, goal_node):
+        times['init'] = time.perf_counter() - started
+        return stats
+    goal_row, goal_column = divmod(goal_id, width)
+
+    def walkable(node):
+        return costs[node] != inf
+
+    # How far a jump goes from each node in each direction only depends on the walls, so it is looked up
+    # in the grid's jump table instead of being scanned for; only the goal has to be checked for here
+    distances = mazearray.jump_table(diagonals).distances
+
+    # Where a jump from node in direction (dr, dc) stops: the goal or a cell lined up with it if either
+    # is on the way (a path may turn towards the goal there), otherwise the jump point the table gives,
+    # or None if the jump runs into a wall first
+    def jump(node, row, column, dr, dc):
+        distance = distances[dr, dc][node]
+        reach = distance if distance > 0 else -distance
+        to_row, to_column = (goal_row - row) * dr, (goal_column - column) * dc
+        if dr and dc:
+            steps = min(to_row, to_column)
+        elif dc:
+            steps = to_column if to_row == 0 else 0
+        # Without diagonals a vertical jump also stops on the goal's row, where a sideways jump may reach it
+        elif not diagonals or goal_column == column:
+            steps = to_row
+        else:
+            steps = 0
+        if 0 < steps <= reach:
+            return node + steps * (dr*width + dc)
+        if distance > 0:
+            return node + distance * (dr*width + dc)
+        return None
+
+    # The directions worth searching from node, given the direction (dr, dc) we arrived in
+    def directions(node, dr, dc):
+        if dr == 0 and dc == 0:
+            moves = ((1,0), (-1,0), (0,1), (0,-1))
+            if diagonals:
+                moves += ((1,1), (1,-1), (-1,1), (-1,-1))
+            return moves
+        if not diagonals:
+            if dc:
+                return ((0,dc), (1,0), (-1,0))
+            return ((dr,0), (0,1), (0,-1))
+        if dr and dc:
+            moves = [(dr,0), (0,dc), (dr,dc)]
+            if not walkable(node - dc):
+                moves.append((dr,-dc))
+            if not walkable(node - dr*width):
+                moves.append((-dr,dc))
+            return moves
+        if dc:
+            moves = [(0,dc)]
+            if not walkable(node + width):
+                moves.append((1,dc))
+            if not walkable(node - width):
+                moves.append((-1,dc))
+            return moves
+        moves = [(dr,0)]
+        if not walkable(node + 1):
+            moves.append((dr,1))
+        if not walkable(node - 1):
+            moves.append((dr,-1))
+        return moves
+
+    state = adjacency.search_state()
+    g = state.g
+    parent = state.parent
+    touched = state.touched
+
+    # Ties on priority go to the node furthest from the start (hence -distance), which heads straight
+    # for the goal; otherwise every jump point on the shortest paths' contour would be expanded
+    heap = [(0, 0, start_id)]
+
+    g[start_id] = 0
+    parent[start_id] = None
+    touched.append(start_id)
+    expanded, pushed, stale_pops, max_frontier = 0, 1, 0, 0
+    if on_push is not None:
+        on_push(*start_point)
+
+    search_started = time.perf_counter()
+    times['init'] = search_started - started
+
+    # Main algorithm loop
+    while heap:
+        if len(heap) > max_frontier:
+            max_frontier = len(heap)
+        priority, current_distance, current_node = heapq.heappop(heap)
+        current_distance = -current_distance
+
+        # A shorter route to this node was found after this entry was pushed
+        if current_distance > g[current_node]:
+            stale_pops += 1
+            continue
+
+        expanded += 1
+        if on_expand is not None:
+            on_expand(*adjacency.cell(current_node))
+
+        if current_node == goal_id:
+            stats.found = True
+            break
+
+        row, column = divmod(current_node, width)
+        dr = dc = 0
+        if parent[current_node] is not None:
+            parent_row, parent_column = divmod(parent[current_node], width)
+            dr = (row > parent_row) - (row < parent_row)
+            dc = (column > parent_column) - (column < parent_column)
+
+        for move in directions(current_node, dr, dc):
+            jump_point = jump(current_node, row, column, *move)
+            if jump_point is None:
+                continue
+
+            jump_row, jump_column = divmod(jump_point, width)
+            neighbour_distance = current_distance + distance_estimate(abs(jump_row - row), abs(jump_column - column), diagonals)
+            if neighbour_distance < g[jump_point]:
+                if g[jump_point] == inf:
+                    touched.append(jump_point)
+                g[jump_point] = neighbour_distance
+                parent[jump_point] = current_node
+                heuristic = distance_estimate(abs(goal_row - jump_row), abs(goal_column - jump_column), diagonals)
+                heapq.heappush(heap, (neighbour_distance+heuristic, -neighbour_distance, jump_point))
+                pushed += 1
+                if on_push is not None:
+                    on_push(jump_row-1, jump_column-1)
+
+        # Mark visited nodes (shown as green)
+        if current_node != start_id:
+            visited_stamps[row-1, column-1] = epoch
+            clock.pause()
+            observer.cell_changed(mazearray, row-1, column-1)
+            yield
+            clock.resume()
+
+    searched = time.perf_counter()
+    clock.split(times, search_started, searched)
+    stats.expanded, stats.pushed, stats.stale_pops, stats.max_frontier = expanded, pushed, stale_pops, max_frontier
+
+    # If the queue ran out before reaching the goal there is no path
+    if not stats.found:
+        return stats
+
+    # Walk back through the jump points, filling in the straight/diagonal runs between them
+    node = goal_id
+    path = [node]
+    while node != start_id:
+        previous = parent[node]
+        row, column = divmod(node, width)
+        previous_row, previous_column = divmod(previous, width)
+        dr = (previous_row > row) - (previous_row < row)
+        dc = (previous_column > column) - (previous_column < column)
+        while node != previous:
+            node += dr*width + dc
+            path.append(node)
+            row, column = adjacency.cell(node)
+            mazearray.path_stamps[row, column] = epoch
+            observer.cell_changed(mazearray, row, column, animate=False)
+    observer.refresh(mazearray)
+
+    path.reverse()
+    stats.path = [adjacency.cell(node) for node in path]
+    stats.path_cost = path_cost(adjacency, path)
+    times['traceback'] = time.perf_counter() - searched
+
+    if on_path is not None:
+        on_path(stats.path)
+    return stats
+
+# Shortest paths for many (start, goal) pairs on the same grid, e.g. routing lots of characters at once
+# Queries are grouped by start, and each start gets a single dijkstra search that runs until all of its
+# goals are reached, so asking for more goals from the same start costs little extra
+# Doesn't mark anything on the grid; returns a (path, distance) pair for each query in the order given,
+# where path is a list of (row, column) cells from start to goal, or ([], inf) if there is no path
+# Takes the same callbacks as the searches, on_path being called once for each path found
+def batch_paths(mazearray, queries, diagonals=False, on_expand=None, on_push=None, on_path=None):
+    adjacency = mazearray.adjacency(diagonals)
+    components = mazearray.components(diagonals)
+    costs = adjacency.costs
+    exits = adjacency.exits
+    moves = adjacency.moves
+
+    goals_by_start = {}
+    for start_point, goal_point in queries:
+        goals_by_start.setdefault(tuple(start_point), set()).add(adjacency.index(*goal_point))
+
+    results = {}
+    for start_point, goals in goals_by_start.items():
+        start_id = adjacency.index(*start_point)
+
+        # Nothing can be reached from a wall, and goals on walls or in another component can never be reached
+        if costs[start_id] == inf:
+            for goal in goals:
+                results[start_point, goal] = ([], inf)
+            continue
+        remaining = {goal for goal in goals if components.connected(start_point, adjacency.cell(goal))}
+
+        state = adjacency.search_state('batch')
+        g = state.g
+        parent = state.parent
+        touched = state.touched
+
+        g[start_id] = 0
+        parent[start_id] = None
+        touched.append(start_id)
+        heap = [(0, start_id)]
+        if on_push is not None:
+            on_push(*start_point)
+
+        while heap and remaining:
+            current_distance, current_node = heapq.heappop(heap)
+            if current_distance > g[current_node]:
+                continue
+            remaining.discard(current_node)
+            if on_expand is not None:
+                on_expand(*adjacency.cell(current_node))
+
+            leave = exits[current_node]
+            for offset, step in moves:
+                neighbour = current_node + offset
+                cost = costs[neighbour]
+                if cost == inf:
+                    continue
+                neighbour_distance = current_distance + step * (cost + leave)
+                if neighbour_distance < g[neighbour]:
+                    if g[neighbour] == inf:
+                        touched.append(neighbour)
+                    g[neighbour] = neighbour_distance
+                    parent[neighbour] = current_node
+                    heapq.heappush(heap, (neighbour_distance, neighbour))
+                    if on_push is not None:
+                        on_push(*adjacency.cell(neighbour))
+
+        for goal in goals:
+            if goal in remaining or g[goal] == inf:
+                results[start_point, goal] = ([], inf)
+                continue
+            path = []
+            node = goal
+            while node is not None:
+                path.append(adjacency.cell(node))
+                node = parent[node]
+            path.reverse()
+            results[start_point, goal] = (path, g[goal])
+            if on_path is not None:
+                on_path(path)
+
+    return [results[tuple(start_point), adjacency.index(*goal_point)] for start_point, goal_point in queries]
+
+# Lower bound on the distance between two cells dr rows and dc columns apart:
+# Manhattan distance, or octile distance when diagonal moves are allowed
+def distance_estimate(dr, dc, diagonals=False):
+    return dr + dc if not diagonals else dr + dc + (2**0.5 - 2) * min(dr, dc)
+
+
+def xfs(mazearray, start_point, goal_node, x, diagonals=False, observer=None, **callbacks):
+    '''
+    This is a function where you choose x='b' or x='d' to run bfs (breadth-first search) or
+    dfs (depth-first search) on your chosen mazearray (grid format), with chosen start_point (x,y)
+    and chosen goal_node (x,y)
+    '''
+    return run_steps(xfs_steps(mazearray, start_point, goal_node, x, diagonals, observer, **callbacks))
+
+# The steps of xfs, yielding after every cell it changes
+# Nodes already visited when they come off the deque count as stale pops
+def xfs_steps(mazearray, start_point, goal_node, x, diagonals=False, observer=None,
+              on_expand=None, on_push=None, on_path=None):
+    assert x == 'b' or x == 'd', "x should equal 'b' or 'd' to make this bfs or dfs"
+    started = time.perf_counter()
+    stats = SearchStats()
+    times = stats.times
+    observer = observer or NULL_OBSERVER
+    clock = render_clock(observer)
+    visited_stamps, epoch = mazearray.visited_stamps, mazearray.epoch
+
+    adjacency = mazearray.adjacency(diagonals)
+    costs = adjacency.costs
+    start_id = adjacency.index(*start_point)
+    goal_id = adjacency.index(*goal_node)
+    # Start and goal in different components: no path
+    if mazearray.components(diagonals).separated(start_point, goal_node):
+        times['init'] = time.perf_counter() - started
+        observer.refresh(mazearray)
+        return stats
+
+    # Create the various data structures with speed in mind
+    mydeque = deque()
+    mydeque.append(start_id)
+    visited_nodes = set([])
+    path_dict = {start_id: None}
+    expanded, pushed, stale_pops, max_frontier = 0, 1, 0, 0
+    if on_push is not None:
+        on_push(*start_point)
+
+    search_started = time.perf_counter()
+    times['init'] = search_started - started
+
+    # Main algorithm loop
+    while len(mydeque) > 0:
+        if len(mydeque) > max_frontier:
+            max_frontier = len(mydeque)
+        if x == 'd':
+            current_node = mydeque.pop()
+        elif x == 'b':
+            current_node = mydeque.popleft()
+
+        if current_node == goal_id:
+            stats.found = True
+            break
+
+        if costs[current_node] == inf:
+            continue
+
+        if current_node not in visited_nodes:
+            visited_nodes.add(current_node)
+            expanded += 1
+            row, column = adjacency.cell(current_node)
+            if on_expand is not None:
+                on_expand(row, column)
+            visited_stamps[row, column] = epoch
+            clock.pause()
+            observer.cell_changed(mazearray, row, column)
+            yield
+            clock.resume()
+
+            # Walls can never be expanded, so they aren't added at all
+            for offset in adjacency.offsets:
+                neighbour = current_node + offset
+                if costs[neighbour] == inf:
+                    continue
+                mydeque.append(neighbour)
+                pushed += 1
+                if on_push is not None:
+                    on_push(*adjacency.cell(neighbour))
+                # Used for tracing back
+                if neighbour not in visited_nodes:
+                    path_dict[neighbour] = current_node
+        else:
+            stale_pops += 1
+
+    searched = time.perf_counter()
+    clock.split(times, search_started, searched)
+    stats.expanded, stats.pushed, stats.stale_pops, stats.max_frontier = expanded, pushed, stale_pops, max_frontier
+
+    if not stats.found:
+        observer.refresh(mazearray)
+        return stats
+
+    # Trace back to start using path_dict
+    path = [goal_id]
+    path_node = goal_id
+    while path_node != start_id:
+        path_node = path_dict[path_node]
+        path.append(path_node)
+        row, column = adjacency.cell(path_node)
+        mazearray.path_stamps[row, column] = epoch
+        observer.cell_changed(mazearray, row, column)
+        yield
+
+    path.reverse()
+    stats.path = [adjacency.cell(node) for node in path]
+    stats.path_cost = path_cost(adjacency, path)
+    times['traceback'] = time.perf_counter() - searched
+
+    if on_path is not None:
+        on_path(stats.path)
+    return stats
@@ -1,5 +1,8 @@
 import heapq
 
+# Largest move cost dijkstra uses a BucketQueue for (see below)
+BUCKET_QUEUE_MAX_COST = 32
+
 class AStarQueue(object):
     def __init__(self):
         self.myheap = []
@@ -15,6 +18,45 @@ class AStarQueue(object):
         return priority, distance, node
 
 
+# A drop-in replacement for AStarQueue when every priority is a whole number
+# (Dial's algorithm): entries go in a bucket per priority, and pop walks forward
+# from the last priority popped to the next bucket with anything in it. That
+# makes push and pop O(1) amortised, with no comparisons between entries, as
+# long as nothing is pushed with a lower priority than the last one popped,
+# which holds for dijkstra and for A* with a consistent heuristic
+# Entries with the same priority come out last in, first out
+# pop walks forward one priority at a time, so it only pays off when moves are cheap:
+# dijkstra uses it while no move costs more than BUCKET_QUEUE_MAX_COST, and the heap otherwise
+class BucketQueue(object):
+    def __init__(self, first=0):
+        # Non-empty buckets only, so the dict is empty exactly when the queue is
+        self.buckets = {}
+        self.current = first
+
+    def show(self):
+        return self.buckets
+
+    def push(self, priority, distance, node):
+        bucket = self.buckets.get(priority)
+        if bucket is None:
+            self.buckets[priority] = [(distance, node)]
+        else:
+            bucket.append((distance, node))
+
+    def pop(self):
+        buckets = self.buckets
+        current = self.current
+        bucket = buckets.get(current)
+        while bucket is None:
+            current += 1
+            bucket = buckets.get(current)
+        self.current = current
+        distance, node = bucket.pop()
+        if not bucket:
+            del buckets[current]
+        return current, distance, node
+
+
 # Create a priority queue
 class PriorityQueue(object):
     def __init__(self):
@@ -0,0 +1,55 @@
+'''
+A set that can also pick one of its items at random.
+
+The items are kept in a list, along with a dict of where each one is in the
+list. Removing an item moves the last one into its place, so adding, removing
+and picking a random item all take O(1) time, where random.choice(tuple(items))
+on a plain set copies the whole set every time.
+
+Picks come from the random module unless a random.Random is passed in, so a
+seeded one gives the same picks every run:
+
+    frontier = RandomSet(rng=random.Random(42))
+'''
+import random
+
+
+class RandomSet():
+    def __init__(self, items=(), rng=None):
+        self.items = []
+        self.positions = {}
+        self.rng = rng or random
+        self.update(items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, item):
+        return item in self.positions
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def add(self, item):
+        if item not in self.positions:
+            self.positions[item] = len(self.items)
+            self.items.append(item)
+
+    def update(self, items):
+        for item in items:
+            self.add(item)
+
+    def remove(self, item):
+        position = self.positions.pop(item)
+        last = self.items.pop()
+        if position < len(self.items):
+            self.items[position] = last
+            self.positions[last] = position
+
+    def discard(self, item):
+        if item in self.positions:
+            self.remove(item)
+
+    # A random item, left in the set
+    def choice(self):
+        return self.items[self.rng.randrange(len(self.items))]
@@ -0,0 +1,98 @@
+'''
+A plain Dijkstra and flood fill, and seeded random grids to run them on, for
+the tests to check the searches, planners and connected components against.
+'''
+import heapq
+import random
+import numpy as np
+import pytest
+from math import inf
+from collections import deque
+from pathfinding import make_grid
+
+STRAIGHT = ((1,0), (-1,0), (0,1), (0,-1))
+DIAGONAL = ((1,1), (1,-1), (-1,1), (-1,-1))
+
+
+# A grid with random walls and, optionally, mud and random exit costs, the same every time for the same seed
+def random_grid(seed, size=24, walls=0.25, mud=0.0, exit_costs=False):
+    rng = np.random.default_rng(seed)
+    grid = make_grid(size)
+    grid.fill('mud', rng.random((size, size)) < mud)
+    grid.fill('wall', rng.random((size, size)) < walls)
+    if exit_costs:
+        grid.set_exit_costs(rng.integers(0, 3, (size, size)))
+    return grid
+
+def open_cells(grid):
+    return [tuple(int(i) for i in cell) for cell in np.argwhere(np.isfinite(grid.costs))]
+
+def moves(diagonals):
+    return [(dr, dc, 1 if dr == 0 or dc == 0 else 2**0.5) for dr, dc in STRAIGHT + (DIAGONAL if diagonals else ())]
+
+# What a single move from a to b costs: b's cost plus a's exit cost, times sqrt(2) for a diagonal
+def move_cost(grid, a, b):
+    step = 1 if a[0] == b[0] or a[1] == b[1] else 2**0.5
+    exit_cost = grid.exit_costs[a] if grid.exit_costs is not None else 0
+    return step * (float(grid.costs[b]) + float(exit_cost))
+
+# Distance from point to every cell (or from every cell to point, with backwards=True), by plain Dijkstra
+def reference_distances(grid, point, diagonals=False, backwards=False):
+    rows, columns = grid.shape
+    distances = {point: 0}
+    heap = [(0, point)]
+    while heap:
+        distance, cell = heapq.heappop(heap)
+        if distance > distances[cell]:
+            continue
+        for dr, dc, step in moves(diagonals):
+            other = (cell[0] + dr, cell[1] + dc)
+            if not (0 <= other[0] < rows and 0 <= other[1] < columns) or grid.costs[other] == inf:
+                continue
+            other_distance = distance + (move_cost(grid, other, cell) if backwards else move_cost(grid, cell, other))
+            if other_distance < distances.get(other, inf):
+                distances[other] = other_distance
+                heapq.heappush(heap, (other_distance, other))
+    return distances
+
+# Component number of every open cell, by flood fill
+def reference_components(grid, diagonals=False):
+    rows, columns = grid.shape
+    labels = {}
+    for cell in open_cells(grid):
+        if cell in labels:
+            continue
+        labels[cell] = len(labels)
+        label = labels[cell]
+        queue = deque([cell])
+        while queue:
+            current = queue.popleft()
+            for dr, dc, step in moves(diagonals):
+                other = (current[0] + dr, current[1] + dc)
+                if 0 <= other[0] < rows and 0 <= other[1] < columns and grid.costs[other] != inf and other not in labels:
+                    labels[other] = label
+                    queue.append(other)
+    return labels
+
+# Check that path runs from start to goal through open cells one move at a time, and return what it costs
+def path_cost(grid, path, start, goal, diagonals=False):
+    assert path[0] == start and path[-1] == goal
+    for cell in path:
+        assert grid.costs[cell] != inf
+    for a, b in zip(path, path[1:]):
+        assert max(abs(a[0] - b[0]), abs(a[1] - b[1])) == 1
+        assert diagonals or a[0] == b[0] or a[1] == b[1]
+    return sum(move_cost(grid, a, b) for a, b in zip(path, path[1:]))
+
+def queries(grid, count, seed):
+    cells = open_cells(grid)
+    rnd = random.Random(seed)
+    return [(rnd.choice(cells), rnd.choice(cells)) for _ in range(count)]
+
+# Compare a search's SearchStats with the reference distance
+def check_search(grid, stats, start, goal, diagonals):
+    expected = reference_distances(grid, start, diagonals).get(goal, inf)
+    assert bool(stats) == (expected != inf)
+    if stats:
+        assert stats.path_cost == pytest.approx(expected)
+        assert path_cost(grid, stats.path, start, goal, diagonals) == pytest.approx(expected)
@@ -0,0 +1,91 @@
+'''
+Running step generators a frame at a time.
+
+The maze generators and searches in pathfinding.py have *_steps versions that
+yield after every cell they change. A Scheduler advances one of them once per
+frame for as many steps as fit in the frame's time budget, optionally capped
+to a steps-per-second rate so animations run at a predictable speed. Between
+frames the program is free to draw the changed cells and handle input, and a
+run can be cancelled at any point.
+
+    scheduler.start(dijkstra_steps(grid, start, end, observer=observer), on_finish=show_result)
+    while running:
+        scheduler.advance()
+        draw()
+'''
+import time
+
+# Don't let a run that fell behind its steps-per-second rate catch up with more than this many seconds' worth at once
+MAX_CATCH_UP = 0.1
+
+
+class Scheduler():
+    def __init__(self, frame_budget=0.01):
+        # Longest time (in seconds) to spend on steps in each call to advance()
+        self.frame_budget = frame_budget
+
+        self.steps = None
+        self.on_finish = None
+        self.steps_per_second = None
+        self.allowance = 0
+        self.last_advance = None
+
+    @property
+    def running(self):
+        return self.steps is not None
+
+    # Start running a step generator, cancelling whatever was running before
+    # on_finish is called with the generator's result when it finishes
+    def start(self, steps, on_finish=None, steps_per_second=None):
+        self.cancel()
+        self.steps = steps
+        self.on_finish = on_finish
+        self.steps_per_second = steps_per_second
+        self.allowance = 0
+        self.last_advance = None
+
+    # Stop the current run without finishing it (on_finish isn't called)
+    def cancel(self):
+        if self.steps is not None:
+            self.steps.close()
+        self.steps = None
+        self.on_finish = None
+
+    # Run steps until the frame budget or the steps-per-second allowance runs out, or the run finishes
+    # Returns True if the run is still going
+    def advance(self):
+        if self.steps is None:
+            return False
+
+        now = time.perf_counter()
+        deadline = now + self.frame_budget
+
+        limit = None
+        if self.steps_per_second:
+            if self.last_advance is None:
+                self.allowance = 1
+            else:
+                self.allowance = min(self.allowance + (now - self.last_advance) * self.steps_per_second,
+                                     MAX_CATCH_UP * self.steps_per_second)
+            self.last_advance = now
+            limit = int(self.allowance)
+
+        steps = self.steps
+        taken = 0
+        try:
+            while limit is None or taken < limit:
+                next(steps)
+                taken += 1
+                if time.perf_counter() > deadline:
+                    break
+        except StopIteration as finished:
+            on_finish = self.on_finish
+            self.steps = None
+            self.on_finish = None
+            if on_finish is not None:
+                on_finish(finished.value)
+            return False
+        finally:
+            self.allowance -= taken
+
+        return True
@@ -0,0 +1,90 @@
+'''
+What a search did.
+
+The searches in pathfinding.py return a SearchStats instead of printing their
+timings. It is true when a path was found, so code that only wants to know
+that can keep treating the result as True/False:
+
+    stats = dijkstra(grid, (1, 1), (93, 93), astar=True)
+    if stats:
+        print(stats.path_cost, stats.expanded, stats.times['search'])
+'''
+import time
+from math import inf
+
+# The phases a search's time is split into: setting up, the main loop, following the path back,
+# and handing cells to the observer (including time spent paused between steps while they are drawn)
+PHASES = ('init', 'search', 'traceback', 'render')
+
+
+# Keeps the time a search spends handing cells to its observer (and paused while they are drawn)
+# out of its search time: call pause() before telling the observer and resume() once the search
+# carries on. Without an observer use NullRenderClock, which never reads the clock
+class RenderClock():
+    def __init__(self):
+        self.time = 0.0
+        self.paused = 0.0
+
+    def pause(self):
+        self.paused = time.perf_counter()
+
+    def resume(self):
+        self.time += time.perf_counter() - self.paused
+
+    # Split the time from started to finished between the search and render phases
+    def split(self, times, started, finished):
+        times['search'] = finished - started - self.time
+        times['render'] = self.time
+
+
+class NullRenderClock(RenderClock):
+    def pause(self):
+        pass
+
+    def resume(self):
+        pass
+
+
+class SearchStats():
+    def __init__(self):
+        self.found = False
+        # Nodes taken off the frontier and expanded, entries put on the frontier, and entries
+        # taken off it that were already out of date (a shorter route had been found since)
+        self.expanded = 0
+        self.pushed = 0
+        self.stale_pops = 0
+        # Largest number of entries on the frontier at once
+        self.max_frontier = 0
+        # The path as (row, column) cells from start to end, and what it costs to follow
+        self.path = []
+        self.path_cost = inf
+        # Seconds spent in each phase
+        self.times = dict.fromkeys(PHASES, 0.0)
+
+    def __bool__(self):
+        return self.found
+
+    @property
+    def path_length(self):
+        return len(self.path)
+
+    @property
+    def total_time(self):
+        return sum(self.times.values())
+
+    # Everything but the path, as plain values (e.g. for writing out as JSON)
+    def as_dict(self):
+        return {
+            'found': self.found,
+            'expanded': self.expanded,
+            'pushed': self.pushed,
+            'stale_pops': self.stale_pops,
+            'max_frontier': self.max_frontier,
+            'path_length': self.path_length,
+            'path_cost': self.path_cost if self.found else None,
+            'times': dict(self.times),
+        }
+
+    def __repr__(self):
+        result = f"path of {self.path_length} cells costing {self.path_cost:.4g}" if self.found else "no path"
+        return f"{result} after expanding {self.expanded} nodes in {self.total_time:.4f} seconds"
@@ -0,0 +1,70 @@
+'''
+Checks the flat-index adjacency the searches read: the neighbours of each cell
+and the cost lists.
+
+    python -m pytest -q
+'''
+import numpy as np
+import pytest
+from math import inf
+from pathfinding import make_grid, get_neighbours
+
+
+# The same open neighbours as get_neighbours, at the same move costs
+@pytest.mark.parametrize('diagonals', [False, True])
+def test_neighbours(diagonals):
+    grid = make_grid(9)
+    grid.fill('wall', np.random.default_rng(0).random((9, 9)) < 0.3)
+    grid.fill('mud', np.random.default_rng(1).random((9, 9)) < 0.2)
+    adjacency = grid.adjacency(diagonals)
+    for row in range(9):
+        for column in range(9):
+            expected = {}
+            for cell, kind in get_neighbours((row, column), 8, diagonals):
+                if grid.costs[cell] != inf:
+                    diagonal = cell[0] != row and cell[1] != column
+                    expected[cell] = float(grid.costs[cell]) * (2**0.5 if diagonal else 1)
+            found = {adjacency.cell(node): cost for node, cost in adjacency.neighbours(adjacency.index(row, column))}
+            assert found == pytest.approx(expected)
+
+def test_costs_match_the_grid():
+    grid = make_grid(12)
+    grid.fill('wall', (3, slice(None)))
+    grid.fill('mud', (slice(5, 8), slice(2, 9)))
+    grid.set_exit_costs(np.arange(144).reshape(12, 12) % 3)
+    adjacency = grid.adjacency()
+    for row in range(12):
+        for column in range(12):
+            node = adjacency.index(row, column)
+            assert adjacency.costs[node] == grid.costs[row, column]
+            assert adjacency.exits[node] == grid.exit_costs[row, column]
+    # The padding around the grid is all wall
+    assert adjacency.costs[0] == inf and adjacency.costs[-1] == inf
+
+# With only a few different costs, each one is a single shared float object
+def test_costs_share_float_objects():
+    grid = make_grid(40)
+    grid.fill('mud', np.random.default_rng(0).random((40, 40)) < 0.3)
+    adjacency = grid.adjacency()
+    assert len({id(cost) for cost in adjacency.costs}) == 3
+    assert len({id(exit_cost) for exit_cost in adjacency.exits}) == 1
+
+def test_many_different_costs():
+    grid = make_grid(40)
+    costs = 1 + np.random.default_rng(0).random((40, 40))
+    grid.set_costs(costs)
+    adjacency = grid.adjacency()
+    assert adjacency.costs[adjacency.index(7, 9)] == float(grid.costs[7, 9])
+    assert adjacency.min_cost == float(grid.costs.min())
+
+# Editing a cell only changes that cell's entry
+def test_update_cell():
+    grid = make_grid(10)
+    adjacency = grid.adjacency()
+    grid[4][5].update(nodetype='mud')
+    grid[2][2].update(nodetype='wall')
+    adjacency = grid.adjacency()
+    assert adjacency.costs[adjacency.index(4, 5)] == 3
+    assert adjacency.costs[adjacency.index(2, 2)] == inf
+    assert adjacency.costs[adjacency.index(4, 6)] == 1
+    assert adjacency.max_cost == 3
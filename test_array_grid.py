@@ -0,0 +1,95 @@
+'''
+Checks the array-backed grid: cells read and written through grid[row][column],
+copies and comparisons, and clearing the visited cells and the path by starting
+a new epoch, with the dirty cells that leaves for the display to redraw.
+
+    python -m pytest -q
+'''
+import numpy as np
+from math import inf
+from array_grid import ArrayGrid, MAX_EPOCH, VISITED, PATH
+from node import Node
+from pathfinding import make_grid, dijkstra
+
+
+def stamped_cells(grid):
+    return {tuple(cell) for cell in np.argwhere(grid.flags).tolist()}
+
+# grid[row][column] reads and writes the arrays like a Node would
+def test_node_views():
+    grid = make_grid(10)
+    grid[2][3].update(nodetype='mud')
+    grid[4][4].update(nodetype='wall', is_visited=True)
+    grid[5][6].update(is_path=True)
+    assert grid[2][3].nodetype == 'mud' and grid.costs[2, 3] == Node.distance_modifiers['mud']
+    assert grid.nodetype(4, 4) == 'wall' and grid.costs[4, 4] == inf
+    assert grid[4][4].is_visited and not grid[4][4].is_path
+    assert grid[5][6].color == Node.colors['path']['blank']
+    assert len(grid) == 10 and len(grid[0]) == 10
+    # Every cell's colour at once is the same as asking each cell
+    colors = grid.colors()
+    for row in range(10):
+        for column in range(10):
+            assert tuple(colors[row, column]) == tuple(grid[row][column].color)
+
+def test_copy_and_compare():
+    grid = make_grid(12)
+    grid.fill('wall', (slice(None), 6))
+    grid.set_exit_costs(np.ones((12, 12)))
+    other = grid.copy()
+    assert other.equals(grid) and other.changed_cells(grid) == []
+    grid[3][6].update(nodetype='blank')
+    grid[7][2].update(is_visited=True)
+    assert not other.equals(grid)
+    assert other.changed_cells(grid) == [(3, 6), (7, 2)]
+    assert other.exit_costs is not grid.exit_costs and (other.exit_costs == 1).all()
+
+# One byte for the type, four for the cost and two for each stamp
+def test_size():
+    grid = ArrayGrid(100, columns=50)
+    assert grid.shape == (100, 50)
+    assert grid.nbytes == 100 * 50 * 9
+
+def test_clear_visited():
+    grid = make_grid(20)
+    grid.fill('wall', (10, slice(2, 20)))
+    stats = dijkstra(grid, (0, 0), (19, 19), astar=True)
+    row, column = stats.path[5]
+    assert grid[row][column].is_path and grid.flags_at(row, column) & PATH
+    assert (grid.flags & VISITED).any()
+    grid.clear_visited()
+    assert not grid.flags.any()
+    assert not grid[row][column].is_path
+    assert grid.nodetype(10, 5) == 'wall'
+
+# The visited and path cells are all the display has to redraw, until that is most of the grid
+def test_clear_visited_dirty_cells():
+    grid = make_grid(20)
+    assert grid.take_dirty() is None
+    dijkstra(grid, (0, 0), (19, 19), astar=True)
+    grid.take_dirty()
+    stamped = stamped_cells(grid)
+    grid.clear_visited()
+    assert grid.take_dirty() == stamped
+    dijkstra(grid, (0, 0), (19, 19))
+    grid.clear_visited()
+    assert grid.take_dirty() is None
+
+# Nothing is collected when nothing is drawing the grid
+def test_clear_visited_without_display():
+    grid = make_grid(20)
+    dijkstra(grid, (0, 0), (19, 19), astar=True)
+    grid.clear_visited()
+    assert grid.dirty is None
+
+# When the epochs run out the stamps are zeroed and they start again
+def test_epochs_wrap_round():
+    grid = make_grid(10)
+    grid.epoch = MAX_EPOCH
+    grid[3][4].update(is_visited=True)
+    grid[5][6].update(is_path=True)
+    grid.take_dirty()
+    grid.clear_visited()
+    assert grid.epoch == 1
+    assert not grid.flags.any()
+    assert grid.take_dirty() == {(3, 4), (5, 6)}
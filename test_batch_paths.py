@@ -0,0 +1,39 @@
+'''
+Checks batch_paths against a plain reference Dijkstra (see reference.py), on
+small seeded random grids with walls, mud and exit costs.
+
+    python -m pytest -q
+'''
+import pytest
+from math import inf
+from pathfinding import make_grid, batch_paths
+from reference import random_grid, reference_distances, path_cost, queries
+
+@pytest.mark.parametrize('seed', range(4))
+@pytest.mark.parametrize('diagonals', [False, True])
+def test_batch_paths(seed, diagonals):
+    grid = random_grid(seed, walls=0.35, mud=0.2, exit_costs=seed % 2 == 1)
+    # Several goals per start, some of them cut off from it
+    batch = [(start, goal) for start, _ in queries(grid, 4, seed) for _, goal in queries(grid, 5, seed + 1)]
+    batch.append(((0, 0), (0, 0)))
+    for (start, goal), (path, distance) in zip(batch, batch_paths(grid, batch, diagonals=diagonals)):
+        expected = reference_distances(grid, start, diagonals).get(goal, inf) if grid.costs[start] != inf else inf
+        assert distance == pytest.approx(expected)
+        if expected != inf:
+            assert path_cost(grid, path, start, goal, diagonals) == pytest.approx(expected)
+        else:
+            assert path == []
+
+# Queries from the same start share one search, which stops once all their goals are found, and the grid is left as it was
+def test_one_search_per_start():
+    grid = random_grid(5, walls=0.2)
+    before = grid.copy()
+    batch = [((0, 0), goal) for _, goal in queries(grid, 6, 5)] + [((0, 0), (0, 0))]
+    starts = []
+    expanded = []
+    results = batch_paths(grid, batch, on_push=lambda row, column: starts.append((row, column)),
+                          on_expand=lambda row, column: expanded.append((row, column)))
+    assert starts[0] == (0, 0) and starts.count((0, 0)) == 1
+    assert len(expanded) == len(set(expanded))
+    assert results[-1] == ([(0, 0)], 0)
+    assert grid.equals(before)
@@ -0,0 +1,32 @@
+'''
+Checks bidirectional Dijkstra and A* against a plain reference Dijkstra (see
+reference.py), on small seeded random grids with walls, mud and exit costs.
+
+    python -m pytest -q
+'''
+import pytest
+from pathfinding import make_grid, dijkstra, bidirectional
+from reference import random_grid, queries, check_search
+
+@pytest.mark.parametrize('seed', range(6))
+@pytest.mark.parametrize('diagonals', [False, True])
+@pytest.mark.parametrize('astar', [False, True])
+def test_bidirectional(seed, diagonals, astar):
+    grid = random_grid(seed, mud=0.2, exit_costs=seed % 2 == 1)
+    for start, goal in queries(grid, 5, seed):
+        grid.clear_visited()
+        check_search(grid, bidirectional(grid, start, goal, diagonals=diagonals, astar=astar), start, goal, diagonals)
+
+# The two searches meet in the middle, so between them they cover less ground than one search from the start
+def test_expands_less_than_dijkstra():
+    grid = make_grid(41)
+    one_way = dijkstra(grid, (20, 0), (20, 40))
+    grid.clear_visited()
+    both_ways = bidirectional(grid, (20, 0), (20, 40))
+    assert both_ways.path_cost == one_way.path_cost
+    assert both_ways.expanded < one_way.expanded * 0.75
+
+def test_start_is_goal():
+    grid = make_grid(5)
+    stats = bidirectional(grid, (2, 2), (2, 2))
+    assert stats and stats.path == [(2, 2)]
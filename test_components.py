@@ -0,0 +1,39 @@
+'''
+Checks the connected components, kept up to date as walls are added and
+removed, against a flood fill.
+
+    python -m pytest -q
+'''
+import random
+import numpy as np
+import pytest
+from pathfinding import reachable, dijkstra, bidirectional, jump_point_search
+from reference import random_grid, reference_components, queries
+
+
+# The components are updated a cell at a time as walls are added and removed, and rebuilt after bulk changes
+@pytest.mark.parametrize('seed', range(6))
+@pytest.mark.parametrize('diagonals', [False, True])
+def test_components(seed, diagonals):
+    grid = random_grid(seed, walls=0.4)
+    rnd = random.Random(seed)
+    for edit in range(40):
+        if edit == 20:
+            grid.fill('wall', np.random.default_rng(seed).random(grid.shape) < 0.2)
+        else:
+            grid[rnd.randrange(24)][rnd.randrange(24)].update(nodetype=rnd.choice(['wall', 'blank']))
+        expected = reference_components(grid, diagonals)
+        components = grid.components(diagonals)
+        assert components.count == len(set(expected.values()))
+        for a, b in queries(grid, 20, seed + edit):
+            assert reachable(grid, a, b, diagonals) == (expected[a] == expected[b])
+            assert components.separated(a, b) == (expected[a] != expected[b])
+
+# With the start and goal cut off from each other the searches give up without expanding anything
+@pytest.mark.parametrize('search', [dijkstra, bidirectional, jump_point_search])
+def test_searches_stop_when_separated(search):
+    grid = random_grid(0, walls=0.0)
+    grid.fill('wall', (slice(None), 12))
+    stats = search(grid, (3, 3), (20, 20))
+    assert not stats and stats.expanded == 0
+    assert search(grid, (3, 3), (20, 5))
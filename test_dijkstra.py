@@ -0,0 +1,50 @@
+'''
+Checks dijkstra and A* against a plain reference Dijkstra (see reference.py),
+on small seeded random grids with walls, mud and exit costs.
+
+    python -m pytest -q
+'''
+import pytest
+from math import inf
+from array_grid import PATH
+from pathfinding import make_grid, dijkstra
+from reference import random_grid, queries, check_search
+
+@pytest.mark.parametrize('seed', range(6))
+@pytest.mark.parametrize('diagonals', [False, True])
+@pytest.mark.parametrize('astar', [False, True])
+def test_dijkstra(seed, diagonals, astar):
+    grid = random_grid(seed, mud=0.2, exit_costs=seed % 2 == 1)
+    for start, goal in queries(grid, 5, seed):
+        grid.clear_visited()
+        check_search(grid, dijkstra(grid, start, goal, diagonals=diagonals, astar=astar), start, goal, diagonals)
+
+# The per-node arrays are reused from one search to the next, and only what a search touched is reset
+def test_search_state_is_reset():
+    grid = random_grid(2, mud=0.2)
+    for start, goal in queries(grid, 3, 2):
+        grid.clear_visited()
+        check_search(grid, dijkstra(grid, start, goal), start, goal, False)
+    state = grid.adjacency().search_state()
+    assert state.touched == [] and all(distance == inf for distance in state.g)
+
+def test_start_is_goal():
+    grid = make_grid(5)
+    stats = dijkstra(grid, (2, 2), (2, 2), astar=True)
+    assert stats and stats.path == [(2, 2)] and stats.path_cost == 0
+
+# The path is followed back along the parent pointers, and the cells marked as path on the grid are the same ones
+# (apart from the goal, which keeps its own colour)
+@pytest.mark.parametrize('diagonals', [False, True])
+def test_path_reconstruction(diagonals):
+    grid = random_grid(4, walls=0.3, mud=0.3)
+    for start, goal in queries(grid, 6, 4):
+        grid.clear_visited()
+        paths = []
+        stats = dijkstra(grid, start, goal, diagonals=diagonals, on_path=paths.append)
+        check_search(grid, stats, start, goal, diagonals)
+        if stats:
+            assert paths == [stats.path]
+            marked = {cell for cell in zip(*grid.flags.nonzero()) if grid.flags_at(*cell) & PATH}
+            assert marked == set(stats.path[:-1])
+            assert len(set(stats.path)) == len(stats.path)
@@ -0,0 +1,44 @@
+'''
+Checks Eller's algorithm mazes, on a grid and streamed out in bands.
+
+    python -m pytest -q
+'''
+import numpy as np
+import pytest
+from array_grid import ArrayGrid
+from pathfinding import eller, eller_bands, BLANK, WALL
+from reference import reference_components
+
+
+# A perfect maze: every open cell can reach every other, by exactly one route
+# (so the open cells and the moves between them form a tree)
+@pytest.mark.parametrize('rows, columns', [(31, 31), (21, 41), (40, 26)])
+def test_perfect_maze(rows, columns):
+    grid = ArrayGrid(rows, columns=columns)
+    eller(grid, seed=rows)
+    types = grid.types
+    assert set(np.unique(types)) == {BLANK, WALL}
+    assert (types[0] == WALL).all() and (types[:, 0] == WALL).all()
+
+    open_ = types == BLANK
+    cells = int(open_.sum())
+    moves = int((open_[1:] & open_[:-1]).sum() + (open_[:, 1:] & open_[:, :-1]).sum())
+    assert moves == cells - 1
+    assert len(set(reference_components(grid).values())) == 1
+
+
+# The bands, stacked up, are the same maze as eller fills in for the same seed, whatever their height
+@pytest.mark.parametrize('band_rows', [1, 7, 64])
+def test_bands(band_rows):
+    grid = ArrayGrid(45, columns=33)
+    eller(grid, seed=3)
+    bands = list(eller_bands(45, 33, band_rows=band_rows, seed=3))
+    assert [top for top, band in bands] == list(range(0, 45, band_rows))
+    assert all(len(band) <= band_rows for top, band in bands)
+    assert np.array_equal(np.concatenate([band for top, band in bands]), grid.types)
+
+
+def test_seeds():
+    first, second, third = (np.concatenate([band for top, band in eller_bands(41, seed=seed)]) for seed in (1, 1, 2))
+    assert np.array_equal(first, second)
+    assert not np.array_equal(first, third)
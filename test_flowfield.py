@@ -0,0 +1,46 @@
+'''
+Checks flow fields against a plain reference Dijkstra (see reference.py) run
+backwards from the goal, with edits in between updates.
+
+    python -m pytest -q
+'''
+import random
+import pytest
+from math import inf
+from flowfield import FlowField
+from reference import random_grid, open_cells, reference_distances, path_cost, queries
+
+
+@pytest.mark.parametrize('seed', range(4))
+@pytest.mark.parametrize('diagonals', [False, True])
+def test_flow_field(seed, diagonals):
+    grid = random_grid(seed, mud=0.2, exit_costs=seed % 2 == 1)
+    goal = queries(grid, 1, seed)[0][1]
+    field = FlowField(grid, diagonals=diagonals)
+    rnd = random.Random(seed)
+    for edit in range(4):
+        field.update(goal)
+        expected = reference_distances(grid, goal, diagonals, backwards=True)
+        distance = field.distance
+        for cell in open_cells(grid):
+            assert distance[cell] == pytest.approx(expected.get(cell, inf))
+            route = field.route(cell)
+            if cell in expected:
+                assert path_cost(grid, route, cell, goal, diagonals) == pytest.approx(expected[cell])
+            else:
+                assert route == []
+        cell = (rnd.randrange(24), rnd.randrange(24))
+        if cell != goal:
+            grid[cell[0]][cell[1]].update(nodetype=rnd.choice(['wall', 'mud', 'blank']))
+
+# Each agent's next step is one move closer to the goal, by the cost of that move
+def test_next_step():
+    grid = random_grid(2, mud=0.3)
+    goal = queries(grid, 1, 2)[0][1]
+    field = FlowField(grid).update(goal)
+    distance = field.distance
+    for cell in open_cells(grid):
+        if cell == goal or distance[cell] == inf:
+            continue
+        step = field.next_step(*cell)
+        assert path_cost(grid, [cell, step], cell, step) + distance[step] == pytest.approx(distance[cell])
@@ -0,0 +1,22 @@
+'''
+Checks that the engine modules can be used without pygame.
+
+    python -m pytest -q
+'''
+import subprocess
+import sys
+
+ENGINE_MODULES = ('pathfinding', 'array_grid', 'incremental', 'hierarchical', 'flowfield', 'parallel', 'scheduler', 'benchmark')
+
+
+# In a fresh interpreter, so that nothing else has imported pygame already
+def test_engine_does_not_import_pygame():
+    script = f"import sys; import {', '.join(ENGINE_MODULES)}; print('pygame' in sys.modules)"
+    output = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True).stdout
+    assert output.strip() == 'False'
+
+def test_search_without_window():
+    from pathfinding import make_grid, recursive_division, dijkstra
+    grid = make_grid(95)
+    recursive_division(grid)
+    assert dijkstra(grid, (1, 1), (93, 93))
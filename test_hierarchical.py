@@ -0,0 +1,57 @@
+'''
+Checks the hierarchical planner's paths against a plain reference Dijkstra
+(see reference.py), with edits in between queries.
+
+    python -m pytest -q
+'''
+import random
+import numpy as np
+import pytest
+from math import inf
+from hierarchical import HierarchicalPlanner
+from reference import random_grid, reference_distances, path_cost, queries
+
+
+# Paths go through the chosen entrances, so they can be longer than the shortest but never shorter
+@pytest.mark.parametrize('seed', range(6))
+@pytest.mark.parametrize('diagonals', [False, True])
+def test_paths(seed, diagonals):
+    grid = random_grid(seed, size=40, walls=0.2, mud=0.1)
+    planner = HierarchicalPlanner(grid, cluster_size=8, diagonals=diagonals)
+    rnd = random.Random(seed)
+    for start, goal in queries(grid, 10, seed):
+        # An edit may have walled them in the meantime
+        if grid.costs[start] == inf or grid.costs[goal] == inf:
+            continue
+        grid.clear_visited()
+        stats = planner.plan(start, goal)
+        expected = reference_distances(grid, start, diagonals).get(goal, inf)
+        assert bool(stats) == (expected != inf)
+        if stats:
+            assert path_cost(grid, stats.path, start, goal, diagonals) == pytest.approx(stats.path_cost)
+            assert stats.path_cost >= expected - 1e-9
+        for edit in range(3):
+            cell = (rnd.randrange(40), rnd.randrange(40))
+            if cell not in (start, goal):
+                grid[cell[0]][cell[1]].update(nodetype=rnd.choice(['wall', 'mud', 'blank']))
+
+# Without changes to the grid a query doesn't look at the grid again, and an edit only looks at the borders beside it
+def test_update_reads_only_changed_borders(monkeypatch):
+    grid = random_grid(1, size=40, walls=0.2)
+    planner = HierarchicalPlanner(grid, cluster_size=8)
+    start, goal = queries(grid, 1, 1)[0]
+    planner.plan(start, goal)
+    borders = []
+    read = []
+    find_entrances = planner.find_entrances
+    isfinite = np.isfinite
+    monkeypatch.setattr(planner, 'find_entrances', lambda border, costs: borders.append(border) or find_entrances(border, costs))
+    monkeypatch.setattr(np, 'isfinite', lambda cells: read.append(np.size(cells)) or isfinite(cells))
+    grid.clear_visited()
+    planner.plan(start, goal)
+    assert borders == [] and read == []
+    grid[8][20].update(nodetype='wall' if grid.nodetype(8, 20) != 'wall' else 'blank')
+    grid.clear_visited()
+    planner.plan(start, goal)
+    assert sorted(borders) == [('h', 0, 2)]
+    assert max(read) <= 9
@@ -0,0 +1,47 @@
+'''
+Checks the D* Lite planner against a plain reference Dijkstra (see
+reference.py) through sequences of edits and start and goal moves.
+
+    python -m pytest -q
+'''
+import random
+import pytest
+from math import inf
+from incremental import DStarLite
+from pathfinding import make_grid
+from reference import random_grid, queries, check_search
+
+# Edits, start moves and goal moves in between plans, as when dragging in the window
+@pytest.mark.parametrize('seed', range(4))
+@pytest.mark.parametrize('diagonals', [False, True])
+@pytest.mark.parametrize('astar', [False, True])
+def test_dstar_lite(seed, diagonals, astar):
+    grid = random_grid(seed, mud=0.2)
+    rnd = random.Random(seed)
+    planner = DStarLite(grid, diagonals=diagonals, astar=astar)
+    start, goal = queries(grid, 1, seed)[0]
+    for step in range(30):
+        choice = rnd.random()
+        cell = (rnd.randrange(24), rnd.randrange(24))
+        if choice < 0.5:
+            if cell not in (start, goal):
+                grid[cell[0]][cell[1]].update(nodetype=rnd.choice(['wall', 'mud', 'blank']))
+        elif grid.costs[cell] != inf and cell != goal:
+            if choice < 0.8:
+                start = cell
+            else:
+                goal = cell
+        check_search(grid, planner.plan(start, goal), start, goal, diagonals)
+
+# Once the search has been built (on the second plan with the same goal), an edit away from the path
+# and a step of the start only repair a little of it
+@pytest.mark.parametrize('astar', [False, True])
+def test_repairs_are_small(astar):
+    grid = make_grid(40)
+    planner = DStarLite(grid, astar=astar)
+    planner.plan((0, 0), (39, 39))
+    first = planner.plan((0, 0), (39, 39))
+    grid[5][30].update(nodetype='wall')
+    repaired = planner.plan((0, 1), (39, 39))
+    check_search(grid, repaired, (0, 1), (39, 39), False)
+    assert repaired.expanded < first.expanded / 4
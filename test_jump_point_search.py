@@ -0,0 +1,42 @@
+'''
+Checks jump point search against a plain reference Dijkstra (see
+reference.py), with walls edited between queries.
+
+    python -m pytest -q
+'''
+import random
+import pytest
+from math import inf
+from pathfinding import make_grid, dijkstra, jump_point_search
+from reference import random_grid, queries, check_search
+
+# Uniform costs, so the jump tables are used, and walls edited between queries so they have to be worked out again
+@pytest.mark.parametrize('seed', range(8))
+@pytest.mark.parametrize('diagonals', [False, True])
+def test_jump_point_search(seed, diagonals):
+    grid = random_grid(seed, size=30, walls=[0.0, 0.1, 0.3][seed % 3])
+    rnd = random.Random(seed)
+    for start, goal in queries(grid, 8, seed):
+        if grid.costs[start] == inf or grid.costs[goal] == inf:
+            continue
+        grid.clear_visited()
+        check_search(grid, jump_point_search(grid, start, goal, diagonals=diagonals), start, goal, diagonals)
+        row, column = rnd.randrange(30), rnd.randrange(30)
+        grid[row][column].update(nodetype=rnd.choice(['wall', 'blank']))
+
+# Falls back to A* when there is mud
+def test_jump_point_search_with_mud():
+    grid = random_grid(1, mud=0.3)
+    for start, goal in queries(grid, 5, 1):
+        grid.clear_visited()
+        check_search(grid, jump_point_search(grid, start, goal), start, goal, False)
+
+# On open ground it jumps straight across instead of expanding every cell A* would
+@pytest.mark.parametrize('diagonals', [False, True])
+def test_expands_less_than_astar(diagonals):
+    grid = make_grid(41)
+    astar = dijkstra(grid, (0, 0), (40, 33), diagonals=diagonals, astar=True)
+    grid.clear_visited()
+    jumps = jump_point_search(grid, (0, 0), (40, 33), diagonals=diagonals)
+    assert jumps.path_cost == pytest.approx(astar.path_cost)
+    assert jumps.expanded * 10 < astar.expanded
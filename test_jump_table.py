@@ -0,0 +1,57 @@
+'''
+Checks that the jump tables patched after each wall edit match ones worked out
+from scratch.
+
+    python -m pytest -q
+'''
+import random
+import numpy as np
+import pytest
+from math import inf
+from pathfinding import make_grid, recursive_division
+from jump_table import JumpTable
+
+
+# Compare the grid's jump table with a new one, at every open cell (the padding's distances are never used)
+def check_table(grid, diagonals):
+    table = grid.jump_table(diagonals)
+    fresh = JumpTable(grid.adjacency(diagonals))
+    fresh.rebuild(np.isfinite(grid.costs))
+    open_ = np.isfinite(grid.adjacency(diagonals).costs)
+    for direction, distances in fresh.views.items():
+        assert (table.views[direction][open_] == distances[open_]).all()
+
+@pytest.mark.parametrize('seed', range(8))
+@pytest.mark.parametrize('diagonals', [False, True])
+def test_patched_after_edits(seed, diagonals):
+    rng = np.random.default_rng(seed)
+    rnd = random.Random(seed)
+    size = 40
+    grid = make_grid(size)
+    grid.fill('wall', rng.random((size, size)) < [0.05, 0.2, 0.35, 0.5][seed % 4])
+    grid.jump_table(diagonals)
+    for edit in range(15):
+        for _ in range(rnd.choice([1, 1, 3])):
+            grid[rnd.randrange(size)][rnd.randrange(size)].update(nodetype=rnd.choice(['wall', 'blank', 'mud']))
+        check_table(grid, diagonals)
+
+# In a maze a wall edit only changes the lines around it, so the table is patched in place
+@pytest.mark.parametrize('diagonals', [False, True])
+def test_edits_patch_in_place(diagonals):
+    grid = make_grid(95)
+    recursive_division(grid)
+    distances = grid.jump_table(diagonals).distances
+    grid[41][41].update(nodetype='blank' if grid.nodetype(41, 41) == 'wall' else 'wall')
+    grid[10][80].update(nodetype='start')
+    assert grid.jump_table(diagonals).distances is distances
+    check_table(grid, diagonals)
+
+# Walls filled in bulk are only worked out again if a cell has been walled or opened
+def test_bulk_changes():
+    grid = make_grid(30)
+    distances = grid.jump_table().distances
+    grid.fill('blank', (slice(5, 10), slice(None)))
+    assert grid.jump_table().distances is distances
+    grid.fill('wall', (slice(5, 10), 7))
+    assert grid.jump_table().distances is not distances
+    check_table(grid, False)
@@ -0,0 +1,28 @@
+'''
+Checks that ParallelRunner gives the same results as running the same work in
+this process.
+
+    python -m pytest -q
+'''
+import pytest
+import numpy as np
+from pathfinding import batch_paths
+from parallel import ParallelRunner, generate
+from reference import random_grid, queries
+
+# The workers search a copy of the grid in shared memory, which has to carry its exit costs too
+@pytest.mark.parametrize('exit_costs', [False, True])
+def test_parallel_batch_paths(exit_costs):
+    grid = random_grid(3, mud=0.2, exit_costs=exit_costs)
+    batch = queries(grid, 12, 3)
+    with ParallelRunner(grid, processes=2) as runner:
+        assert runner.batch_paths(batch) == batch_paths(grid, batch)
+
+# A maze made from a seed is the same from any worker, and the same as one made from that seed without the runner
+def test_generate():
+    with ParallelRunner(processes=2) as runner:
+        mazes = runner.generate('recursive_division', seeds=[1, 2, 1], rows=31)
+    assert np.array_equal(mazes[0].types, mazes[2].types)
+    assert not np.array_equal(mazes[0].types, mazes[1].types)
+    assert np.array_equal(mazes[1].types, generate(('recursive_division', 2, 31, (0, 0), (30, 30))))
+    assert mazes[0].nodetype(0, 0) == 'start' and mazes[0].nodetype(30, 30) == 'end'
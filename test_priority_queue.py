@@ -0,0 +1,70 @@
+'''
+Checks the bucket queue, and that dijkstra uses it only when it can.
+
+    python -m pytest -q
+'''
+import random
+import heapq
+import numpy as np
+import pytest
+import pathfinding
+from priority_queue import BucketQueue, AStarQueue, BUCKET_QUEUE_MAX_COST
+from pathfinding import dijkstra
+from reference import random_grid, queries, check_search
+
+
+# Pushing nothing below the last priority popped (as dijkstra does), entries come
+# out in the same order of priority as from a heap
+def test_same_priorities_as_a_heap():
+    rnd = random.Random(0)
+    buckets, heap = BucketQueue(), AStarQueue()
+    popped = 0
+    for step in range(5000):
+        if rnd.random() < 0.55 or not heap.show():
+            priority = popped + rnd.randrange(4)
+            buckets.push(priority, priority, step)
+            heap.push(priority, priority, step)
+        else:
+            popped = heap.pop()[0]
+            assert buckets.pop()[0] == popped
+    while heap.show():
+        assert buckets.pop()[0] == heap.pop()[0]
+    assert not buckets.show()
+
+def test_last_in_first_out():
+    queue = BucketQueue(first=5)
+    for node in range(3):
+        queue.push(7, 2, node)
+    queue.push(6, 1, 'a')
+    assert [queue.pop() for pop in range(4)] == [(6, 1, 'a'), (7, 2, 2), (7, 2, 1), (7, 2, 0)]
+    assert not queue.show()
+
+# Whole number costs use the bucket queue; fractional costs, dear moves and diagonal moves
+# the heap. Either way the distances are right
+@pytest.mark.parametrize('costs, diagonals, bucket', [
+    (None, False, True),
+    (None, True, False),
+    ('whole', False, True),
+    ('fractional', False, False),
+    ('dear', False, False),
+])
+def test_queue_chosen(costs, diagonals, bucket, monkeypatch):
+    used = []
+    class CountedBucketQueue(BucketQueue):
+        def __init__(self):
+            used.append(self)
+            BucketQueue.__init__(self)
+    monkeypatch.setattr(pathfinding, 'BucketQueue', CountedBucketQueue)
+
+    grid = random_grid(3, walls=0.2, mud=0.2)
+    rng = np.random.default_rng(3)
+    if costs == 'whole':
+        grid.set_costs(rng.integers(1, 10, grid.shape))
+    elif costs == 'fractional':
+        grid.set_costs(rng.random(grid.shape) + 1)
+    elif costs == 'dear':
+        grid.set_costs(rng.integers(1, 10, grid.shape) * BUCKET_QUEUE_MAX_COST)
+    for start, goal in queries(grid, 10, 3):
+        for astar in (False, True):
+            check_search(grid, dijkstra(grid, start, goal, diagonals, astar), start, goal, diagonals)
+    assert bool(used) == bucket
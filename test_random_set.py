@@ -0,0 +1,46 @@
+'''
+Checks RandomSet and the seeded Prim generators that keep their frontier in one.
+
+    python -m pytest -q
+'''
+import random
+import numpy as np
+import pytest
+from collections import Counter
+from random_set import RandomSet
+from pathfinding import prim, better_prim, reachable
+
+
+# Against a plain set, through a random mix of adds and removes
+def test_same_items_as_a_set():
+    rnd = random.Random(0)
+    items = RandomSet()
+    expected = set()
+    for step in range(2000):
+        item = rnd.randrange(50)
+        if rnd.random() < 0.5:
+            items.add(item)
+            expected.add(item)
+        else:
+            items.discard(item)
+            expected.discard(item)
+        assert len(items) == len(expected) and set(items) == expected
+        assert all(items.positions[item] == position for position, item in enumerate(items.items))
+    with pytest.raises(KeyError):
+        items.remove(50)
+
+# Every item is picked about as often as any other, and a seeded one picks the same every time
+def test_choice():
+    items = RandomSet(range(10), rng=random.Random(1))
+    picks = Counter(items.choice() for pick in range(10000))
+    assert set(picks) == set(range(10)) and min(picks.values()) > 800
+    again = RandomSet(range(10), rng=random.Random(1))
+    first = RandomSet(range(10), rng=random.Random(1))
+    assert [again.choice() for pick in range(20)] == [first.choice() for pick in range(20)]
+
+@pytest.mark.parametrize('generator', [prim, better_prim])
+def test_seeded_prim(generator):
+    maze = generator(41, (1, 1), (39, 39), seed=7)
+    assert np.array_equal(maze.types, generator(41, (1, 1), (39, 39), seed=7).types)
+    assert not np.array_equal(maze.types, generator(41, (1, 1), (39, 39), seed=8).types)
+    assert reachable(maze, (1, 1), (39, 39))
@@ -0,0 +1,69 @@
+'''
+Checks recursive division mazes, divided depth first and breadth first.
+
+    python -m pytest -q
+'''
+import random
+import numpy as np
+import pytest
+from array_grid import ArrayGrid
+from pathfinding import Observer, recursive_division, recursive_division_steps, WALL
+from reference import reference_components
+
+
+# Keeps the walls drawn, in order
+class Walls(Observer):
+
+    def __init__(self):
+        self.walls = []
+
+    def region_changed(self, mazearray, rows, columns):
+        self.walls.append((rows.start, rows.stop, columns.start, columns.stop))
+
+
+# Every open cell can reach every other, on square and non-square grids
+@pytest.mark.parametrize('order', ['depth', 'breadth'])
+@pytest.mark.parametrize('halving', [True, False])
+@pytest.mark.parametrize('rows, columns', [(31, 31), (40, 70), (70, 40)])
+def test_solvable(order, halving, rows, columns):
+    for seed in range(3):
+        random.seed(seed)
+        grid = ArrayGrid(rows, columns=columns)
+        recursive_division(grid, halving=halving, order=order)
+        assert (grid.types == WALL).any()
+        assert len(set(reference_components(grid).values())) == 1
+
+# Halving, the chambers don't depend on the gaps, so both orders draw the same walls,
+# but breadth first draws all the walls splitting the grid's quarters before going any further
+def test_orders():
+    drawn = {}
+    for order in ('depth', 'breadth'):
+        random.seed(0)
+        observer = Walls()
+        recursive_division(ArrayGrid(64), observer=observer, order=order)
+        drawn[order] = observer.walls
+    assert sorted(drawn['depth']) == sorted(drawn['breadth'])
+    assert drawn['depth'] != drawn['breadth']
+    for order, quarters in (('depth', False), ('breadth', True)):
+        lengths = [max(bottom - top, right - left) for top, bottom, left, right in drawn[order][:10]]
+        assert (min(lengths) >= 31) == quarters
+
+# One step for every chamber divided (with one or two walls each), and only the chamber asked for is divided
+def test_steps():
+    grid = ArrayGrid(40)
+    observer = Walls()
+    steps = sum(1 for step in recursive_division_steps(grid, chamber=(10, 5, 20, 30), observer=observer))
+    assert 1 < steps <= len(observer.walls) <= 2 * steps
+    walls = grid.types == WALL
+    assert walls[10:30, 5:35].any()
+    walls[10:30, 5:35] = False
+    assert not walls.any()
+    with pytest.raises(AssertionError):
+        recursive_division(grid, order='sideways')
+
+# Big grids don't run into the recursion limit
+def test_big_grid():
+    random.seed(0)
+    grid = ArrayGrid(600)
+    recursive_division(grid, halving=False)
+    assert (grid.types == WALL).mean() > 0.3
@@ -0,0 +1,69 @@
+'''
+Checks running step generators a frame at a time.
+
+    python -m pytest -q
+'''
+from scheduler import Scheduler
+from pathfinding import make_grid, dijkstra, dijkstra_steps
+
+
+def counter(steps, taken):
+    for step in range(steps):
+        taken.append(step)
+        yield
+    return 'done'
+
+def test_runs_to_the_end():
+    taken, results = [], []
+    scheduler = Scheduler(frame_budget=1)
+    scheduler.start(counter(50, taken), on_finish=results.append)
+    assert scheduler.running
+    while scheduler.advance():
+        pass
+    assert taken == list(range(50)) and results == ['done']
+    assert not scheduler.running
+
+# With no time to spare each frame still takes a step, so a run always makes progress
+def test_frame_budget():
+    taken = []
+    scheduler = Scheduler(frame_budget=0)
+    scheduler.start(counter(10, taken))
+    for frame in range(3):
+        scheduler.advance()
+    assert taken == [0, 1, 2]
+
+# The first frame of a rate-limited run takes one step, and a run can't catch up on more than MAX_CATCH_UP seconds
+def test_steps_per_second():
+    taken = []
+    scheduler = Scheduler(frame_budget=1)
+    scheduler.start(counter(1000, taken), steps_per_second=100)
+    scheduler.advance()
+    assert len(taken) == 1
+    scheduler.last_advance -= 60
+    scheduler.advance()
+    assert len(taken) <= 1 + 100 * 0.1 + 1
+
+def test_cancel():
+    taken, results = [], []
+    scheduler = Scheduler(frame_budget=0)
+    steps = counter(10, taken)
+    scheduler.start(steps, on_finish=results.append)
+    scheduler.advance()
+    scheduler.cancel()
+    assert not scheduler.advance() and results == []
+    assert steps.gi_frame is None
+
+# A search run a frame at a time gives the same result as one run straight through
+def test_search_steps():
+    grid = make_grid(30)
+    grid.fill('wall', (15, slice(0, 28)))
+    expected = dijkstra(grid, (0, 0), (29, 0), astar=True)
+    grid.clear_visited()
+    results = []
+    scheduler = Scheduler(frame_budget=0)
+    scheduler.start(dijkstra_steps(grid, (0, 0), (29, 0), astar=True), on_finish=results.append)
+    frames = 0
+    while scheduler.advance():
+        frames += 1
+    assert frames > 10
+    assert results[0].path == expected.path
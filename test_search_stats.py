@@ -0,0 +1,64 @@
+'''
+Checks the SearchStats the searches return and the callbacks they make.
+
+    python -m pytest -q
+'''
+import json
+import pytest
+from math import inf
+from pathfinding import Observer, make_grid, dijkstra, bidirectional, jump_point_search, xfs
+from search_stats import SearchStats, PHASES
+from reference import random_grid, path_cost
+
+SEARCHES = {
+    'dijkstra': lambda grid, start, goal, **callbacks: dijkstra(grid, start, goal, **callbacks),
+    'astar': lambda grid, start, goal, **callbacks: dijkstra(grid, start, goal, astar=True, **callbacks),
+    'bidirectional': lambda grid, start, goal, **callbacks: bidirectional(grid, start, goal, **callbacks),
+    'jump_point_search': lambda grid, start, goal, **callbacks: jump_point_search(grid, start, goal, **callbacks),
+    'bfs': lambda grid, start, goal, **callbacks: xfs(grid, start, goal, 'b', **callbacks),
+    'dfs': lambda grid, start, goal, **callbacks: xfs(grid, start, goal, 'd', **callbacks),
+}
+
+
+# Every node expanded and pushed is passed to the callbacks, and counted in the stats
+@pytest.mark.parametrize('search', list(SEARCHES))
+@pytest.mark.parametrize('mud', [0.0, 0.2])
+def test_callbacks(search, mud, capsys):
+    grid = random_grid(1, size=40, walls=0, mud=mud)
+    # Walls across the grid with a gap at alternate ends, for the searches to wind round
+    for row in (10, 20, 30):
+        grid.fill('wall', (row, slice(row // 10 % 2, 39 + row // 10 % 2)))
+    expanded, pushed, paths = [], [], []
+    stats = SEARCHES[search](grid, (0, 0), (39, 39), on_expand=lambda row, column: expanded.append((row, column)),
+                             on_push=lambda row, column: pushed.append((row, column)), on_path=paths.append)
+    assert isinstance(stats, SearchStats) and stats
+    assert stats.expanded == len(expanded) > 0 and stats.pushed == len(pushed) >= stats.expanded
+    assert 0 <= stats.stale_pops <= stats.pushed - stats.expanded
+    assert 0 < stats.max_frontier <= stats.pushed
+    assert paths == [stats.path] and stats.path_length == len(stats.path)
+    assert stats.path_cost == path_cost(grid, stats.path, (0, 0), (39, 39))
+    assert set(stats.times) == set(PHASES) and all(time >= 0 for time in stats.times.values())
+    assert stats.times['render'] == 0
+    # Nothing is printed, however many times the search is run
+    assert capsys.readouterr().out == ''
+
+@pytest.mark.parametrize('search', list(SEARCHES))
+def test_no_path(search):
+    grid = make_grid(20)
+    grid.fill('wall', (10, slice(None)))
+    paths = []
+    stats = SEARCHES[search](grid, (0, 0), (19, 19), on_path=paths.append)
+    assert not stats and stats.path == [] and stats.path_cost == inf and paths == []
+    assert json.loads(json.dumps(stats.as_dict()))['path_cost'] is None
+    assert repr(stats).startswith('no path')
+
+# Time spent in the observer counts as rendering, not searching
+def test_render_time():
+    class Slow(Observer):
+        def cell_changed(self, mazearray, row, column, animate=True):
+            for spin in range(2000):
+                pass
+
+    stats = dijkstra(make_grid(30), (0, 0), (29, 29), observer=Slow())
+    assert stats.times['render'] > stats.times['search'] > 0
+    assert stats.total_time == sum(stats.times.values())
@@ -0,0 +1,46 @@
+'''
+Checks the noise terrain generator.
+
+    python -m pytest -q
+'''
+import random
+import numpy as np
+import pytest
+from array_grid import ArrayGrid, TYPE_CODES
+from pathfinding import noise_terrain, value_noise, TERRAINS
+
+
+# Each terrain covers its share of the grid, and start and end are left alone
+@pytest.mark.parametrize('rows, columns', [(64, 64), (50, 90)])
+def test_shares(rows, columns):
+    grid = ArrayGrid(rows, columns=columns)
+    grid[3][4].update(nodetype='start')
+    grid[rows - 5][columns - 6].update(nodetype='end')
+    noise_terrain(grid, seed=1)
+    assert grid[3][4].nodetype == 'start' and grid[rows - 5][columns - 6].nodetype == 'end'
+    for nodetype, share in TERRAINS:
+        assert abs((grid.types == TYPE_CODES[nodetype]).mean() - share) < 0.01
+
+def test_seeds():
+    grids = [ArrayGrid(48) for grid in range(4)]
+    noise_terrain(grids[0], seed=5)
+    noise_terrain(grids[1], seed=5)
+    noise_terrain(grids[2], seed=6)
+    random.seed(5)
+    noise_terrain(grids[3])
+    assert grids[0].equals(grids[1])
+    assert not grids[0].equals(grids[2])
+    random.seed(5)
+    assert grids[3].equals(noise_terrain(ArrayGrid(48)))
+
+# Neighbouring cells mostly share a terrain, so it comes in regions rather than speckles
+def test_regions():
+    grid = noise_terrain(ArrayGrid(128), seed=2)
+    assert (grid.types[1:] == grid.types[:-1]).mean() > 0.8
+    assert (grid.types[:, 1:] == grid.types[:, :-1]).mean() > 0.8
+
+def test_value_noise():
+    noise = value_noise(40, 70, rng=np.random.default_rng(0))
+    assert noise.shape == (40, 70) and noise.dtype == np.float32
+    assert 0 <= noise.min() and noise.max() <= 1
+    assert np.abs(np.diff(noise, axis=1)).max() < 0.2